@@ -3,20 +3,32 @@ from discord.ext import commands
 from discord import app_commands
 import logging
 import asyncio
+import functools
 import io
+import itertools
+import operator
 import os
 import re
 import subprocess
 import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set, Tuple
 from PIL import Image
 
+# uvloop is optional; when installed it replaces the default asyncio event loop
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 import config
-from image_utils import download_image
+from image_utils import close_http_session, download_attachment_image, download_image, encode_png
 from model_interface import get_model_generator
-from usage_tracker import usage_tracker
+from usage_tracker import usage_tracker, TIER_LIMITS
 from log_manager import log_manager  # importing this module configures logging
 from wordplay_game import session_manager, generate_word_pair_with_gemini, generate_word_image
 
@@ -30,22 +42,118 @@ if config.DEBUG_LOGGING:
 # All UI classes removed - bot now returns natural API responses directly
 
 # Bot setup
-intents = discord.Intents.default()
-intents.message_content = True
+# Only the gateway events the bot uses: guild/channel cache, members (for the Discord tools),
+# and guild/DM messages with their content (mentions, replies, prefix commands, snitching).
+# Typing, reactions, voice states, invites etc. from Intents.default() are never handled.
+intents = discord.Intents.none()
+intents.guilds = True
 intents.members = True
-bot = commands.Bot(command_prefix=config.COMMAND_PREFIX, intents=intents, help_command=None)
+intents.guild_messages = True
+intents.dm_messages = True
+intents.message_content = True
+
+
+class ZPTBot(commands.Bot):
+    """commands.Bot that also releases the bot's own resources on shutdown."""
+    
+    async def close(self):
+        await super().close()
+        # Usage records and wordplay sessions are written in the background; don't lose pending writes
+        await flush_usage_records()
+        await session_manager.flush_sessions()
+        await close_http_session()
+
+
+bot = ZPTBot(command_prefix=config.COMMAND_PREFIX, intents=intents, help_command=None)
 
 # Bot snitching feature - track messages that mention the bot
 # Structure: {message_id: {'content': str, 'author_id': int, 'channel_id': int, 'timestamp': datetime}}
 tracked_messages: Dict[int, Dict[str, Any]] = {}
+MAX_TRACKED_MESSAGES = 1000  # Oldest tracked messages are dropped beyond this, even if under 8 hours old
 DEFAULT_SNITCH_CONTENT = "use me"  # Fallback text when message only contained bot mention
 # Reused for parsing mentioned users out of model tool-call arguments such as "<@123>".
 USER_MENTION_PATTERN = re.compile(r"<@!?(\d+)>")
 
+
+@functools.lru_cache(maxsize=None)
+def get_user_mention_pattern(user_id: int) -> re.Pattern:
+    """Return a compiled pattern matching both mention forms of one user: <@id> and <@!id>."""
+    return re.compile(rf"<@!?{user_id}>")
+
+# Fallback for attachments Discord sends without a content type; str.endswith takes the tuple directly
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+# Display names for image models, keyed by model type
+MODEL_DISPLAY_NAMES = {"nanobanana": "Gemini", "gemini": "Gemini", "gpt": "GPT Image 2"}
+
+# Embed colors: generated results/puzzles, and the small input-image previews
+RESULT_EMBED_COLOR = discord.Color.blue()
+INPUT_IMAGE_EMBED_COLOR = discord.Color.light_grey()
+
 # Discord embed character limits
 EMBED_DESCRIPTION_MAX_LENGTH = 4096
 EMBED_FIELD_VALUE_MAX_LENGTH = 1024
 
+
+def truncate_text(text: str, max_length: int) -> str:
+    """Return text unchanged if it fits in max_length, otherwise cut it and end with '...'."""
+    if len(text) <= max_length:
+        return text
+    return text[:max_length - 3] + "..."
+
+
+def build_tier_choice_name(tier: str, limit: float) -> str:
+    """Build the /tier option label for a tier, e.g. 'Standard (3 charges)'."""
+    if limit == float('inf'):
+        return tier.title()
+    return f"{tier.title()} ({int(limit)} charge{'s' if limit != 1 else ''})"
+
+
+# /tier options, built once from TIER_LIMITS so labels always match the configured limits
+TIER_CHOICES = [
+    app_commands.Choice(name=build_tier_choice_name(tier, limit), value=tier)
+    for tier, limit in TIER_LIMITS.items()
+]
+
+# /avatar templates as (value, display name, prompt, emoji), built once at import
+AVATAR_TEMPLATES = (
+    (
+        'halloween',
+        'Halloween',
+        "Modify this users avatar so that it is Halloween themed. Attempt to provide the subject of the avatar so that it is wearing a Halloween outfit that best suits the subject",
+        '🎃',
+    ),
+    ('christmas', 'Christmas', "Christmasify this image", '🎄'),
+    ('newyear', 'New Year', "Represent this image in a New Year's party setting for 2026", '🎆'),
+)
+AVATAR_TEMPLATE_CHOICES = [app_commands.Choice(name=name, value=value) for value, name, _, _ in AVATAR_TEMPLATES]
+# template value -> (prompt, emoji)
+AVATAR_TEMPLATE_LOOKUP = {value: (prompt, emoji) for value, _, prompt, emoji in AVATAR_TEMPLATES}
+
+# Finished /avatar transformations as (PNG bytes, model text), keyed by (avatar URL, template).
+# Discord avatar URLs contain the avatar's hash, so a changed avatar gets a new key and a
+# repeat request for the same avatar and template is answered without another model call.
+_avatar_result_cache: "OrderedDict[Tuple[str, str], Tuple[bytes, Optional[str]]]" = OrderedDict()
+
+
+def get_cached_avatar_result(avatar_url: str, template_value: str) -> Optional[Tuple[bytes, Optional[str]]]:
+    """Return a cached avatar transformation, marking it most recently used, or None."""
+    key = (avatar_url, template_value)
+    result = _avatar_result_cache.get(key)
+    if result is not None:
+        _avatar_result_cache.move_to_end(key)
+    return result
+
+
+def cache_avatar_result(avatar_url: str, template_value: str, image_data: bytes, text_response: Optional[str]) -> None:
+    """Cache an avatar transformation, evicting the least recently used beyond AVATAR_CACHE_SIZE."""
+    key = (avatar_url, template_value)
+    _avatar_result_cache[key] = (image_data, text_response)
+    _avatar_result_cache.move_to_end(key)
+    while len(_avatar_result_cache) > config.AVATAR_CACHE_SIZE:
+        _avatar_result_cache.popitem(last=False)
+
+
 def get_git_commit_hash() -> Optional[str]:
     """Return the current git commit hash shortened to 7 characters, or None if unavailable."""
     try:
@@ -58,7 +166,7 @@ def get_git_commit_hash() -> Optional[str]:
         if result.returncode == 0:
             return result.stdout.strip()
     except Exception as e:
-        logger.debug(f'Failed to get git commit hash: {e}')
+        logger.debug('Failed to get git commit hash: %s', e)
     return None
 
 
@@ -231,33 +339,155 @@ async def execute_discord_tool_for_message(message: discord.Message, tool_name:
     return {"ok": False, "error": f"Unsupported Discord tool '{tool_name}'."}
 
 
+# Caps how many image generation calls run at once; extra requests wait their turn
+# instead of all competing for the API and holding decoded images in memory together.
+_generation_semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_GENERATIONS)
+# Chat replies get their own cap, so a quick text answer never queues behind slow image renders
+_chat_semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_CHAT_RESPONSES)
+GENERATION_QUEUED_MESSAGE = "⏳ Waiting for a free generation slot..."
+# Replies shared by several commands, defined once
+DM_NOT_ALLOWED_MESSAGE = "❌ You don't have permission to use this bot in DMs. Only elevated users can use the bot in direct messages."
+USAGE_LIMIT_LATER_MESSAGE = "⏰ You've reached your usage limit. Please try again later."
+CONVERSATION_ERROR_MESSAGE = "An error occurred while processing your request. Please try again."
+
+# Generated images are archived to disk by a single background worker so the write
+# never delays a reply and concurrent generations don't each occupy a thread. The worker
+# writes the PNG bytes already encoded for the Discord upload, so each image is encoded once.
+_archive_queue: "asyncio.Queue[Tuple[bytes, Path]]" = asyncio.Queue()
+_archive_worker_task: Optional[asyncio.Task] = None
+# Resolved once; config creates the directory on import
+GENERATED_IMAGES_PATH = Path(config.GENERATED_IMAGES_DIR)
+
+# Token/image usage is recorded by a background worker as well: record_usage rewrites the
+# usage JSON file, so doing it inline would hold up the reply on disk I/O. Records are
+# applied in arrival order, so reserved slots are consumed in the order they were granted.
+_usage_queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+_usage_worker_task: Optional[asyncio.Task] = None
+
+
+# Per-process sequence number appended to image filenames so two images generated at
+# the same instant get distinct names instead of overwriting each other in the archive
+_image_filename_counter = itertools.count(1)
+
+
+def build_image_filename(prefix: str) -> str:
+    """Build a PNG filename like 'chat_1735732800000000000_7.png' (Unix time in ns, then sequence)."""
+    return f"{prefix}_{time.time_ns()}_{next(_image_filename_counter)}.png"
+
+
+def queue_image_archive(image_data: bytes, filename: str) -> None:
+    """Queue encoded image bytes to be written under GENERATED_IMAGES_DIR."""
+    _archive_queue.put_nowait((image_data, GENERATED_IMAGES_PATH / filename))
+
+
+async def archive_worker():
+    """Persist queued generated images to disk one at a time."""
+    while True:
+        image_data, filepath = await _archive_queue.get()
+        try:
+            await asyncio.to_thread(filepath.write_bytes, image_data)
+        except Exception as e:
+            logger.error("Failed to archive generated image %s: %s", filepath, e)
+        finally:
+            _archive_queue.task_done()
+
+
+# Token count keys in the usage_metadata dict returned by the model generators
+USAGE_TOKEN_KEYS = ("prompt_token_count", "candidates_token_count", "total_token_count")
+
+
+def usage_token_counts(usage_metadata: Dict[str, Any]) -> Tuple[int, int, int]:
+    """Return (prompt, output, total) token counts from usage metadata, 0 for any missing count."""
+    return tuple(usage_metadata.get(key, 0) for key in USAGE_TOKEN_KEYS)
+
+
+def queue_usage_record(**record) -> None:
+    """Queue a usage_tracker.record_usage call (same keyword arguments) for the usage worker."""
+    _usage_queue.put_nowait(record)
+
+
+async def usage_worker():
+    """Apply queued usage records, writing each batch of waiting records with one save of the usage file."""
+    while True:
+        records = [await _usage_queue.get()]
+        while not _usage_queue.empty():
+            records.append(_usage_queue.get_nowait())
+        try:
+            await asyncio.to_thread(usage_tracker.record_usage_batch, records)
+        except Exception as e:
+            logger.error("Failed to record %d usage entries: %s", len(records), e)
+        finally:
+            for _ in records:
+                _usage_queue.task_done()
+
+
+async def flush_usage_records() -> None:
+    """Wait until every queued usage record is written, e.g. before shutting down."""
+    if _usage_worker_task is not None and not _usage_worker_task.done():
+        await _usage_queue.join()
+        return
+    # No worker running (it never started or has stopped): write the backlog here
+    records = []
+    while not _usage_queue.empty():
+        records.append(_usage_queue.get_nowait())
+    if not records:
+        return
+    try:
+        await asyncio.to_thread(usage_tracker.record_usage_batch, records)
+    except Exception as e:
+        logger.error("Failed to record %d usage entries: %s", len(records), e)
+    finally:
+        for _ in records:
+            _usage_queue.task_done()
+
+
 def cleanup_old_tracked_messages():
-    """Remove tracked messages older than 8 hours."""
-    current_time = datetime.now()
+    """Remove tracked messages older than 8 hours, then trim the oldest beyond MAX_TRACKED_MESSAGES - 1."""
+    cutoff = datetime.now() - timedelta(hours=8)
     expired_ids = []
     
+    # Messages are inserted in arrival order, so the oldest entries come first and
+    # the scan can stop at the first one that is still fresh.
     for message_id, data in tracked_messages.items():
-        if current_time - data['timestamp'] > timedelta(hours=8):
-            expired_ids.append(message_id)
+        if data['timestamp'] >= cutoff:
+            break
+        expired_ids.append(message_id)
     
     for message_id in expired_ids:
         del tracked_messages[message_id]
     
+    # Keep room for the message about to be tracked
+    overflow = len(tracked_messages) - MAX_TRACKED_MESSAGES + 1
+    if overflow > 0:
+        for message_id in list(itertools.islice(tracked_messages, overflow)):
+            del tracked_messages[message_id]
+    
     if expired_ids:
-        logger.info(f"Cleaned up {len(expired_ids)} expired tracked messages")
+        logger.info("Cleaned up %s expired tracked messages", len(expired_ids))
 
 @bot.event
 async def on_ready():
     """Called when the bot is ready."""
-    global _git_commit_hash
-    logger.info(f'{bot.user} has connected to Discord!')
-    logger.info(f'Bot is in {len(bot.guilds)} guilds')
+    global _git_commit_hash, _archive_worker_task, _usage_worker_task
+    logger.info('%s has connected to Discord!', bot.user)
+    logger.info('Bot is in %s guilds', len(bot.guilds))
+
+    # on_ready can fire again after a reconnect, so only start the background workers once
+    if _archive_worker_task is None or _archive_worker_task.done():
+        _archive_worker_task = asyncio.create_task(archive_worker())
+    if _usage_worker_task is None or _usage_worker_task.done():
+        _usage_worker_task = asyncio.create_task(usage_worker())
+
+    # Restore wordplay puzzles saved before a restart (only the first on_ready reads the file),
+    # then drop day-old sessions so the session map doesn't grow for the life of the process
+    session_manager.load_sessions()
+    session_manager.start_cleanup_task()
 
     # Cache the git commit hash and set bot status to "ZPT <hash>"
     _git_commit_hash = get_git_commit_hash()
     if _git_commit_hash:
         status = f"ZPT {_git_commit_hash}"
-        logger.info(f'Setting bot status to: {status}')
+        logger.info('Setting bot status to: %s', status)
         await bot.change_presence(activity=discord.Game(name=status))
     else:
         logger.warning('Could not determine git commit hash; bot status will not be set')
@@ -265,9 +495,9 @@ async def on_ready():
     # Sync slash commands
     try:
         synced = await bot.tree.sync()
-        logger.info(f'Synced {len(synced)} slash commands')
+        logger.info('Synced %s slash commands', len(synced))
     except Exception as e:
-        logger.error(f'Failed to sync slash commands: {e}')
+        logger.error('Failed to sync slash commands: %s', e)
 
 @bot.event
 async def on_message(message):
@@ -276,14 +506,21 @@ async def on_message(message):
     if message.author.bot:
         return
     
+    mentioned = is_directly_mentioned(message, bot.user.id)
+    is_command = message.content.startswith(config.COMMAND_PREFIX)
+    # Most messages the bot sees don't mention it, run a command or reply to anything;
+    # drop them before any usage tracker lookups (which read its JSON file)
+    if not (mentioned or is_command or message.reference):
+        return
+    
     # Check if message is from a DM channel and user is not elevated
     if is_dm_channel(message.channel) and not usage_tracker.is_elevated_user(message.author.id):
         # Don't respond to non-elevated users in DM channels
-        logger.info(f"Blocked non-elevated user {message.author.id} from using bot in DM channel")
+        logger.info("Blocked non-elevated user %s from using bot in DM channel", message.author.id)
         return
     
     # Track messages that mention the bot for snitching feature
-    if is_directly_mentioned(message.content, bot.user.id):
+    if mentioned:
         # Clean up old tracked messages before adding new one
         cleanup_old_tracked_messages()
         
@@ -294,31 +531,29 @@ async def on_message(message):
             'channel_id': message.channel.id,
             'timestamp': datetime.now()
         }
-        logger.info(f"Tracking message {message.id} from user {message.author.id} in channel {message.channel.id}")
+        logger.info("Tracking message %s from user %s in channel %s", message.id, message.author.id, message.channel.id)
     
-    # Check if user has reached usage limit (only for non-elevated users)
-    if not usage_tracker.is_elevated_user(message.author.id):
-        has_limit, next_available = usage_tracker.has_reached_usage_limit(message.author.id)
-        if has_limit:
-            # Only apply this auto-blocking behavior to prefix commands
-            is_command = message.content.startswith(config.COMMAND_PREFIX)
-            
-            if is_command:
+    if is_command:
+        # Check if user has reached usage limit (only for non-elevated users).
+        # This auto-blocking behavior only applies to prefix commands.
+        if not usage_tracker.is_elevated_user(message.author.id):
+            has_limit, next_available = usage_tracker.has_reached_usage_limit(message.author.id)
+            if has_limit:
                 # React with wilted_rose emoji (no message)
                 try:
                     await message.add_reaction("🥀")  # wilted_rose emoji
                 except Exception as e:
-                    logger.warning(f"Failed to add reaction: {e}")
-                logger.info(f"Blocked user {message.author.id} from using bot - usage limit reached")
+                    logger.warning("Failed to add reaction: %s", e)
+                logger.info("Blocked user %s from using bot - usage limit reached", message.author.id)
                 return
+        
+        # Handle commands first
+        await bot.process_commands(message)
     
-    # Handle commands first
-    await bot.process_commands(message)
-    
-    bot_mentioned = is_directly_mentioned(message.content, bot.user.id)
-    replied_to_bot = await is_reply_to_bot_message(message)
-    if bot_mentioned or replied_to_bot:
-        await handle_conversation_request(message)
+    # Resolve the replied-to message once; the conversation handler reuses it
+    referenced = await resolve_referenced_message(message)
+    if mentioned or is_bot_message(referenced):
+        await handle_conversation_request(message, referenced)
 
 @bot.event
 async def on_message_delete(message):
@@ -331,18 +566,17 @@ async def on_message_delete(message):
             # Get the channel where the message was deleted
             channel = bot.get_channel(tracked_data['channel_id'])
             if not channel:
-                logger.warning(f"Could not find channel {tracked_data['channel_id']} for snitching")
+                logger.warning("Could not find channel %s for snitching", tracked_data['channel_id'])
                 return
             
             # Get the user who sent (and deleted) the message
             user = await bot.fetch_user(tracked_data['author_id'])
             if not user:
-                logger.warning(f"Could not find user {tracked_data['author_id']} for snitching")
+                logger.warning("Could not find user %s for snitching", tracked_data['author_id'])
                 return
             
             # Remove bot mentions from the original content
-            content = tracked_data['content']
-            content = content.replace(f'<@{bot.user.id}>', '').replace(f'<@!{bot.user.id}>', '')
+            content = get_user_mention_pattern(bot.user.id).sub('', tracked_data['content'])
             content = content.strip()
             
             # If content is empty after removing mentions, use a generic message
@@ -354,39 +588,52 @@ async def on_message_delete(message):
             
             # Send the snitching message
             await channel.send(snitch_message)
-            logger.info(f"Snitched on user {user.id} for deleting message {message.id}")
+            logger.info("Snitched on user %s for deleting message %s", user.id, message.id)
             
         except Exception as e:
-            logger.error(f"Error snitching on deleted message {message.id}: {e}")
+            logger.error("Error snitching on deleted message %s: %s", message.id, e)
         finally:
             # Remove the tracked message
             del tracked_messages[message.id]
 
-def is_directly_mentioned(message_content, bot_user_id):
+def is_directly_mentioned(message, bot_user_id):
     """
     Check if the bot is directly mentioned in the message content
     (not just mentioned in a replied-to message)
     """
-    # Standard mention format
-    standard_mention = f'<@{bot_user_id}>'
-    # Nickname mention format  
-    nickname_mention = f'<@!{bot_user_id}>'
-    
-    return standard_mention in message_content or nickname_mention in message_content
+    # message.mentions is already parsed by discord.py, so most messages are ruled out without
+    # scanning their text. It also holds the author of a pinging reply, hence the content check.
+    if not any(user.id == bot_user_id for user in message.mentions):
+        return False
+    return get_user_mention_pattern(bot_user_id).search(message.content) is not None
 
-async def is_reply_to_bot_message(message) -> bool:
-    """Check whether this message is a reply to a bot-authored message."""
+async def resolve_referenced_message(message) -> Optional[discord.Message]:
+    """
+    Return the message this one replies to, or None.
+    
+    Uses the client's message cache, then the copy Discord embeds in the reply event
+    (reference.resolved), and only falls back to a REST fetch when neither has it.
+    """
     if not message.reference or not message.reference.message_id:
-        return False
+        return None
+    
+    resolved = message.reference.resolved
+    if isinstance(resolved, discord.DeletedReferencedMessage):
+        return None
     
     referenced = message.reference.cached_message
+    if referenced is None and isinstance(resolved, discord.Message):
+        referenced = resolved
     if referenced is None:
         try:
             referenced = await message.channel.fetch_message(message.reference.message_id)
-        except Exception:
-            return False
-    
-    return bool(referenced and referenced.author and referenced.author.id == bot.user.id)
+        except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+            return None
+    return referenced
+
+def is_bot_message(message) -> bool:
+    """Check whether a (possibly missing) message was authored by this bot."""
+    return bool(message and message.author and message.author.id == bot.user.id)
 
 def is_dm_channel(channel) -> bool:
     """
@@ -411,12 +658,38 @@ async def check_usage_limit_and_respond(interaction: discord.Interaction) -> boo
             "Zetic doesn't pay me enough to cover that request so try again later",
             ephemeral=True
         )
-        logger.info(f"Blocked user {interaction.user.id} from using slash command - usage limit reached")
+        logger.info("Blocked user %s from using slash command - usage limit reached", interaction.user.id)
         return True
-    
+
     return False
 
 
+# Discord error codes for interactions whose token can no longer be used
+# (10062 = Unknown Interaction, 50027 = Invalid Webhook Token after the 15-minute window).
+EXPIRED_INTERACTION_ERROR_CODES = {10062, 50027}
+
+
+async def send_interaction_message(interaction: discord.Interaction, content: str, ephemeral: bool = True) -> None:
+    """
+    Send a message for an interaction, using a followup once the initial response is done.
+    Expired interaction tokens are logged and ignored instead of raising from error handlers.
+    """
+    try:
+        if interaction.response.is_done():
+            await interaction.followup.send(content, ephemeral=ephemeral)
+        else:
+            await interaction.response.send_message(content, ephemeral=ephemeral)
+    except discord.HTTPException as e:
+        if e.status == 401 or e.code in EXPIRED_INTERACTION_ERROR_CODES:
+            logger.warning("Interaction %s expired before a response could be sent", interaction.id)
+            return
+        raise
+
+
+# Greedy prefix backtracks to the last '. ', '! ' or '? ' in the searched range
+LAST_SENTENCE_END_PATTERN = re.compile(r'.*[.!?] ', re.DOTALL)
+
+
 def split_long_message(content: str, max_length: int = 1800) -> List[str]:
     """
     Split a long message into chunks that fit within Discord's character limits.
@@ -432,48 +705,64 @@ def split_long_message(content: str, max_length: int = 1800) -> List[str]:
         return [content] if content else []
     
     chunks = []
-    remaining = content
+    # Work with indices into the original string so the unsplit tail is never copied;
+    # searches only look past the midpoint of each window so chunks aren't split too early
+    start = 0
+    stop = len(content.rstrip())
     
-    while len(remaining) > max_length:
-        # Find the best split point within the limit
-        split_point = max_length
+    while stop - start > max_length:
+        window_end = start + max_length
+        earliest = start + max_length // 2 + 1
         
         # Try to split at paragraph boundaries first (double newlines)
-        paragraph_split = remaining.rfind('\n\n', 0, max_length)
-        if paragraph_split > max_length // 2:  # Don't split too early
+        paragraph_split = content.rfind('\n\n', earliest, window_end)
+        if paragraph_split != -1:
             split_point = paragraph_split + 2
         else:
-            # Try to split at sentence boundaries
-            sentence_split = max(
-                remaining.rfind('. ', 0, max_length),
-                remaining.rfind('! ', 0, max_length),
-                remaining.rfind('? ', 0, max_length)
-            )
-            if sentence_split > max_length // 2:
-                split_point = sentence_split + 2
+            # Try to split at sentence boundaries (one regex pass finds the last one)
+            sentence_end = LAST_SENTENCE_END_PATTERN.match(content, earliest, window_end)
+            if sentence_end:
+                split_point = sentence_end.end()
             else:
                 # Try to split at word boundaries
-                word_split = remaining.rfind(' ', 0, max_length)
-                if word_split > max_length // 2:
+                word_split = content.rfind(' ', earliest, window_end)
+                if word_split != -1:
                     split_point = word_split + 1
                 else:
                     # Force split at character boundary
-                    split_point = max_length
+                    split_point = window_end
         
         # Extract the chunk and add it
-        chunk = remaining[:split_point].strip()
+        chunk = content[start:split_point].strip()
         if chunk:
             chunks.append(chunk)
         
-        # Move to the next part
-        remaining = remaining[split_point:].strip()
+        # Move to the next part, skipping the whitespace left at the boundary
+        start = split_point
+        while start < stop and content[start].isspace():
+            start += 1
     
-    # Add the final chunk if there's remaining content
-    if remaining:
-        chunks.append(remaining)
+    # Add the final chunk if there's remaining content. It is stripped because the loop is
+    # skipped entirely when only trailing whitespace pushed content over max_length.
+    final_chunk = content[start:stop].strip()
+    if final_chunk:
+        chunks.append(final_chunk)
     
     return chunks
 
+# Supported aspect ratios as specified in the issue
+VALID_ASPECT_RATIOS = frozenset({
+    '21:9', '16:9', '4:3', '3:2',  # Landscape
+    '1:1',  # Square
+    '9:16', '3:4', '2:3',  # Portrait
+    '5:4', '4:5'  # Flexible
+})
+# Pattern to match -X:Y format where X and Y are numbers
+# Use word boundaries to avoid matching in the middle of text
+ASPECT_RATIO_PATTERN = re.compile(r'-(\d+:\d+)\b')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
 def extract_aspect_ratio(text: str) -> Tuple[Optional[str], str]:
     """
     Extract aspect ratio from text in the format -X:Y (e.g., -16:9).
@@ -486,57 +775,54 @@ def extract_aspect_ratio(text: str) -> Tuple[Optional[str], str]:
         Tuple of (aspect_ratio, cleaned_text) where aspect_ratio is None if not found
         or invalid, and cleaned_text has the aspect ratio pattern removed.
     """
-    # Supported aspect ratios as specified in the issue
-    VALID_ASPECT_RATIOS = {
-        '21:9', '16:9', '4:3', '3:2',  # Landscape
-        '1:1',  # Square
-        '9:16', '3:4', '2:3',  # Portrait
-        '5:4', '4:5'  # Flexible
-    }
-    
-    # Pattern to match -X:Y format where X and Y are numbers
-    # Use word boundaries to avoid matching in the middle of text
-    pattern = r'-(\d+:\d+)\b'
-    
-    match = re.search(pattern, text)
+    match = ASPECT_RATIO_PATTERN.search(text)
     
     if match:
         aspect_ratio = match.group(1)
         # Only return if it's a valid aspect ratio
         if aspect_ratio in VALID_ASPECT_RATIOS:
-            # Remove the aspect ratio pattern from the text
-            cleaned_text = re.sub(pattern, '', text, count=1).strip()
+            # Remove the aspect ratio flag using the span already found
+            cleaned_text = f"{text[:match.start()]}{text[match.end():]}".strip()
             # Clean up any double spaces
-            cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
+            cleaned_text = WHITESPACE_PATTERN.sub(' ', cleaned_text).strip()
             return aspect_ratio, cleaned_text
     
     # No valid aspect ratio found, return original text
     return None, text
 
-async def extract_text_from_message(message):
+def extract_text_from_message(message):
     """Extract text content from a message, removing bot mentions."""
-    content = message.content
-    
-    # Remove bot mention
-    content = content.replace(f'<@{bot.user.id}>', '').replace(f'<@!{bot.user.id}>', '')
+    # Remove bot mentions (other user mentions are kept for the Discord tools)
+    return get_user_mention_pattern(bot.user.id).sub('', message.content).strip()
+
+def is_image_attachment(attachment) -> bool:
+    """Check whether an attachment is an image, by content type or else by file extension."""
+    if attachment.content_type:
+        return attachment.content_type.startswith('image/')
+    return attachment.filename.lower().endswith(IMAGE_EXTENSIONS)
+
+async def collect_message_images(message, seen_urls: Optional[Set[str]] = None) -> List[Image.Image]:
+    """
+    Download and return image attachments and embed images from a Discord message.
     
-    # Clean up whitespace
-    content = content.strip()
+    URLs already in seen_urls are skipped, and downloaded URLs are added to it, so a
+    caller can share one set across messages to avoid fetching the same image twice.
+    """
+    if seen_urls is None:
+        seen_urls = set()
     
-    return content
-
-async def collect_message_images(message) -> List[Image.Image]:
-    """Download and return image attachments and embed images from a Discord message."""
-    images = []
-    seen_urls = set()
+    # (url, attachment or None for embed images), in the order the model should see them
+    sources = []
     for attachment in message.attachments:
-        if attachment.content_type and attachment.content_type.startswith('image/'):
+        if is_image_attachment(attachment):
+            if attachment.url in seen_urls:
+                continue
             seen_urls.add(attachment.url)
-            img = await download_image(attachment.url)
-            if img:
-                images.append(img)
-            else:
-                logger.warning(f"Failed to download image attachment {attachment.filename}")
+            # Discord reports the size up front, so oversized files are dropped without a download
+            if attachment.size > config.MAX_IMAGE_SIZE:
+                logger.warning("Skipping oversized image attachment %s (%d bytes)", attachment.filename, attachment.size)
+                continue
+            sources.append((attachment.url, attachment))
 
     # Also collect images embedded in Discord embeds (e.g. bot-generated images shown inside an embed)
     for embed in message.embeds:
@@ -548,59 +834,78 @@ async def collect_message_images(message) -> List[Image.Image]:
         for url in embed_image_urls:
             if url and url not in seen_urls:
                 seen_urls.add(url)
-                img = await download_image(url)
-                if img:
-                    images.append(img)
+                sources.append((url, None))
+
+    # Download everything concurrently; gather keeps results in source order.
+    # Attachments are read through discord.py's session, embed images by URL.
+    downloaded = await asyncio.gather(*(
+        download_attachment_image(attachment) if attachment else download_image(url)
+        for url, attachment in sources
+    ))
+    images = []
+    for (url, attachment), img in zip(sources, downloaded):
+        if img:
+            images.append(img)
+        elif attachment:
+            logger.warning("Failed to download image attachment %s", attachment.filename)
 
     return images
 
 
-async def handle_conversation_request(message):
-    """Handle text-only conversational responses for mentions/replies."""
+async def handle_conversation_request(message, referenced: Optional[discord.Message] = None):
+    """
+    Handle text-only conversational responses for mentions/replies.
+    
+    referenced is the replied-to message if the caller already resolved it; otherwise
+    it is looked up here.
+    """
     reserved_slots = 0
     usage_consumed = False
     usage_limit_message = None
     author_name = str(
         (getattr(message.author, "display_name", None) or getattr(message.author, "name", None) or "Unknown User")
     )
+    thinking_task = None
+    response_message = None
     try:
-        response_message = await message.reply("Thinking...")
-        text_content = await extract_text_from_message(message)
+        # Send the placeholder reply while the prompt and images are gathered
+        thinking_task = asyncio.create_task(message.reply("Thinking..."))
+        text_content = extract_text_from_message(message)
 
         # Collect images from the current message's attachments
-        images = await collect_message_images(message)
+        seen_image_urls: Set[str] = set()
+        images = await collect_message_images(message, seen_image_urls)
 
         # If this message is a reply, include the referenced message's content and images
-        if message.reference and message.reference.message_id:
-            referenced = message.reference.cached_message
-            if referenced is None:
-                try:
-                    referenced = await message.channel.fetch_message(message.reference.message_id)
-                except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-                    referenced = None
-
-            if referenced:
-                ref_text = referenced.content.strip() if referenced.content else ""
-
-                # Also extract text from embeds (bot messages often store content in embeds)
-                for embed in referenced.embeds:
-                    embed_parts = []
-                    if embed.description:
-                        embed_parts.append(embed.description)
-                    for field in embed.fields:
-                        embed_parts.append(f"{field.name}: {field.value}")
-                    if embed_parts:
-                        ref_text = f"{ref_text}\n{'\n'.join(embed_parts)}".strip() if ref_text else "\n".join(embed_parts)
-
-                if ref_text:
-                    author_name = referenced.author.display_name if referenced.author else "Unknown"
-                    text_content = f"[Replied to @{author_name}: {ref_text}]\n\n{text_content}"
-
-                # Place referenced message images first so the model sees them before the reply
-                ref_images = await collect_message_images(referenced)
-                images = ref_images + images
-
-        if not text_content.strip() and not images:
+        if referenced is None:
+            referenced = await resolve_referenced_message(message)
+
+        if referenced:
+            ref_text = referenced.content.strip() if referenced.content else ""
+
+            # Also extract text from embeds (bot messages often store content in embeds)
+            for embed in referenced.embeds:
+                embed_parts = []
+                if embed.description:
+                    embed_parts.append(embed.description)
+                for field in embed.fields:
+                    embed_parts.append(f"{field.name}: {field.value}")
+                if embed_parts:
+                    ref_text = f"{ref_text}\n{'\n'.join(embed_parts)}".strip() if ref_text else "\n".join(embed_parts)
+
+            if ref_text:
+                author_name = referenced.author.display_name if referenced.author else "Unknown"
+                text_content = f"[Replied to @{author_name}: {ref_text}]\n\n{text_content}"
+
+            # Place referenced message images first so the model sees them before the reply.
+            # Images already attached to the reply itself are not downloaded again.
+            ref_images = await collect_message_images(referenced, seen_image_urls)
+            images = ref_images + images
+
+        response_message = await thinking_task
+
+        # extract_text_from_message already strips, and a reply prefix is never blank
+        if not text_content and not images:
             await response_message.edit(content="Please include some text or an image in your message.")
             return
 
@@ -623,23 +928,27 @@ async def handle_conversation_request(message):
                         f"⏰ You've reached your usage limit. Please try again in {hours}h {minutes}m."
                     )
                 else:
-                    usage_limit_message = "⏰ You've reached your usage limit. Please try again later."
+                    usage_limit_message = USAGE_LIMIT_LATER_MESSAGE
 
         generator = get_model_generator("chat")
         start_time = time.monotonic()
-        generated_image, text_response, usage_metadata = await generator.generate_text_only_response(
-            text_content,
-            images if images else None,
-            tool_executor=lambda tool_name, args: execute_discord_tool_for_message(message, tool_name, args),
-            allow_image_generation=allow_image_generation,
-        )
+        if _chat_semaphore.locked():
+            # Show that the request is queued rather than stalled
+            await response_message.edit(content=GENERATION_QUEUED_MESSAGE)
+        async with _chat_semaphore:
+            generated_image, text_response, usage_metadata = await generator.generate_text_only_response(
+                text_content,
+                images if images else None,
+                tool_executor=lambda tool_name, args: execute_discord_tool_for_message(message, tool_name, args),
+                allow_image_generation=allow_image_generation,
+            )
+        # Strip the model's reply once; every check below only cares whether it has content
+        text_response = text_response.strip() if text_response else ""
 
         if usage_metadata and not message.author.bot:
-            prompt_tokens = usage_metadata.get("prompt_token_count", 0)
-            output_tokens = usage_metadata.get("candidates_token_count", 0)
-            total_tokens = usage_metadata.get("total_token_count", 0)
+            prompt_tokens, output_tokens, total_tokens = usage_token_counts(usage_metadata)
             images_generated = 1 if generated_image else 0
-            usage_tracker.record_usage(
+            queue_usage_record(
                 user_id=message.author.id,
                 username=author_name,
                 prompt_tokens=prompt_tokens,
@@ -653,26 +962,23 @@ async def handle_conversation_request(message):
             usage_consumed = images_generated > 0
 
         if usage_limit_message and not generated_image:
-            if text_response and text_response.strip():
+            if text_response:
                 text_response = f"{usage_limit_message}\n\n{text_response}"
             else:
                 text_response = usage_limit_message
 
-        if not generated_image and (not text_response or not text_response.strip()):
+        if not generated_image and not text_response:
             await response_message.edit(content="I couldn't generate a response. Please try again.")
             return
 
         if generated_image:
-            img_buffer = io.BytesIO()
-            generated_image.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"chat_{timestamp}.png"
-            file = discord.File(img_buffer, filename=filename)
-            reply_content = text_response.strip() if text_response and text_response.strip() else "Here's the generated image:"
+            image_data = await encode_png(generated_image)
+            filename = build_image_filename("chat")
+            file = discord.File(io.BytesIO(image_data), filename=filename)
+            reply_content = text_response or "Here's the generated image:"
             image_model_used = usage_metadata.get("image_model_used") if usage_metadata else None
             if image_model_used:
-                model_display = "GPT Image 2" if image_model_used == "gpt" else "Gemini"
+                model_display = MODEL_DISPLAY_NAMES.get(image_model_used, "Gemini")
                 elapsed = time.monotonic() - start_time
                 reply_content += f"\n-# *Used {model_display} in {format_elapsed_time(elapsed)}*"
             await response_message.edit(content=reply_content[:1800], attachments=[file])
@@ -683,37 +989,55 @@ async def handle_conversation_request(message):
         for chunk in chunks[1:]:
             await response_message.channel.send(content=chunk)
     except Exception as e:
-        logger.error(f"Error handling conversation request: {e}")
-        await message.reply("An error occurred while processing your request. Please try again.")
+        logger.error("Error handling conversation request: %s", e)
+        await report_conversation_error(message, thinking_task, response_message)
     finally:
         if reserved_slots > 0 and not usage_consumed:
             usage_tracker.release_reserved_usage_slots(message.author.id, slots=reserved_slots)
 
 
+async def report_conversation_error(message, thinking_task: Optional[asyncio.Task], response_message: Optional[discord.Message]) -> None:
+    """
+    Show the conversation error in the "Thinking..." reply, falling back to a new reply.
+    
+    The placeholder reply is sent concurrently, so it may still be in flight (or have failed)
+    when an error is raised; it is awaited here so it is never left orphaned.
+    """
+    if response_message is None and thinking_task is not None:
+        try:
+            response_message = await thinking_task
+        except Exception as e:
+            logger.warning("Could not send thinking reply: %s", e)
+    if response_message is not None:
+        try:
+            await response_message.edit(content=CONVERSATION_ERROR_MESSAGE, attachments=[])
+            return
+        except discord.HTTPException as e:
+            logger.warning("Could not edit thinking reply with error: %s", e)
+    await message.reply(CONVERSATION_ERROR_MESSAGE)
+
+
 async def generate_image_for_model(model_type: str, text_content: str, images: List, aspect_ratio: Optional[str] = None):
     """Generate an image/text response for the requested model."""
     generator = get_model_generator(model_type)
+    has_text = bool(text_content.strip())
     
-    if images and text_content.strip():
-        if len(images) == 1:
-            return await generator.generate_image_from_text_and_image(text_content, images[0], None, aspect_ratio)
-        return await generator.generate_image_from_text_and_image(text_content, images[0], None, aspect_ratio, images[1:])
     if images:
-        if len(images) == 1:
-            return await generator.generate_image_from_image_only(images[0], None, aspect_ratio)
-        return await generator.generate_image_from_image_only(images[0], None, aspect_ratio, images[1:])
-    if text_content.strip():
+        additional_images = images[1:] or None
+        if has_text:
+            return await generator.generate_image_from_text_and_image(text_content, images[0], None, aspect_ratio, additional_images)
+        return await generator.generate_image_from_image_only(images[0], None, aspect_ratio, additional_images)
+    if has_text:
         return await generator.generate_image_from_text(text_content, None, aspect_ratio)
     return None, None, None
 
 
 async def download_command_images(attachments: List[discord.Attachment], interaction: discord.Interaction) -> Optional[List]:
     """Validate and download slash-command image attachments."""
-    images = []
+    attachments = [a for a in attachments if a]
+    # Validate everything before downloading anything, so a bad attachment fails fast
     for attachment in attachments:
-        if not attachment:
-            continue
-        if not attachment.content_type or not attachment.content_type.startswith('image/'):
+        if not is_image_attachment(attachment):
             await interaction.followup.send(f"❌ `{attachment.filename}` is not an image file.", ephemeral=True)
             return None
         if attachment.size > config.MAX_IMAGE_SIZE:
@@ -722,34 +1046,13 @@ async def download_command_images(attachments: List[discord.Attachment], interac
                 ephemeral=True
             )
             return None
-        
-        image = await download_image(attachment.url)
-        if image:
-            images.append(image)
     
-    return images
+    downloaded = await asyncio.gather(*(download_attachment_image(a) for a in attachments))
+    return [image for image in downloaded if image]
 
 
 
-# Slash command versions
-@bot.tree.command(name='help', description='Show help information')
-async def help_slash(interaction: discord.Interaction):
-    """Show help information (slash command)."""
-    # Check if interaction is from a DM channel and user is not elevated
-    if is_dm_channel(interaction.channel) and not usage_tracker.is_elevated_user(interaction.user.id):
-        await interaction.response.send_message(
-            "❌ You don't have permission to use this bot in DMs. Only elevated users can use the bot in direct messages.",
-            ephemeral=True
-        )
-        logger.info(f"Blocked non-elevated user {interaction.user.id} from using /help in DM channel")
-        return
-    
-    # Use interaction.client.user for safety and provide fallbacks
-    bot_user = interaction.client.user
-    bot_name = bot_user.display_name if bot_user else "Nano Banana"
-    bot_mention = bot_user.mention if bot_user else "@Nano Banana"
-    
-    help_text = f"""**{bot_name} - Help**
+HELP_TEXT_TEMPLATE = """**{bot_name} - Help**
 
 I'm a multi-model bot for conversational text and image generation.
 
@@ -773,8 +1076,91 @@ I'm a multi-model bot for conversational text and image generation.
 • `/log` - Get the most recent log file (elevated users only)
 • `/reset` - Reset cycle image usage for a user (elevated users only)
 • `/tier` - Assign a tier to a user (elevated users only)"""
+
+
+@functools.lru_cache(maxsize=None)
+def build_help_text(bot_name: str, bot_mention: str) -> str:
+    """Render the /help text; the bot's name and mention only change across logins."""
+    return HELP_TEXT_TEMPLATE.format(bot_name=bot_name, bot_mention=bot_mention)
+
+
+# Slash command versions
+@bot.tree.command(name='help', description='Show help information')
+async def help_slash(interaction: discord.Interaction):
+    """Show help information (slash command)."""
+    # Check if interaction is from a DM channel and user is not elevated
+    if is_dm_channel(interaction.channel) and not usage_tracker.is_elevated_user(interaction.user.id):
+        await interaction.response.send_message(
+            DM_NOT_ALLOWED_MESSAGE,
+            ephemeral=True
+        )
+        logger.info("Blocked non-elevated user %s from using /help in DM channel", interaction.user.id)
+        return
+    
+    # Use interaction.client.user for safety and provide fallbacks
+    bot_user = interaction.client.user
+    bot_name = bot_user.display_name if bot_user else "Nano Banana"
+    bot_mention = bot_user.mention if bot_user else "@Nano Banana"
+    
+    await interaction.response.send_message(build_help_text(bot_name, bot_mention))
+
+
+def build_image_result_embeds(
+    model_type: str,
+    prompt: str,
+    text_response: Optional[str],
+    generated_image: Optional[Image.Image],
+    aspect_ratio: Optional[str],
+    image_filename: Optional[str],
+    input_attachments: List[discord.Attachment],
+    elapsed_seconds: float,
+) -> List[discord.Embed]:
+    """
+    Build the embeds for an image command result: one small embed per input image,
+    followed by the result embed (model text, prompt, resolution, aspect ratio, model).
+    """
+    model_name_display = MODEL_DISPLAY_NAMES.get(model_type, "GPT Image 2")
+    embed = discord.Embed(color=RESULT_EMBED_COLOR)
+    
+    # Text response from model in embed description
+    # Skip description if it's just echoing the prompt (e.g. gpt-image), since the Prompt field already shows it
+    text_response_stripped = text_response.strip() if text_response else ""
+    is_prompt_echo = text_response_stripped and prompt and text_response_stripped == prompt.strip()
+    if text_response_stripped and not is_prompt_echo:
+        embed.description = truncate_text(text_response_stripped, EMBED_DESCRIPTION_MAX_LENGTH)
+    
+    # Prompt field
+    prompt_value = prompt if prompt and prompt.strip() else "(no prompt)"
+    embed.add_field(name="Prompt", value=truncate_text(prompt_value, EMBED_FIELD_VALUE_MAX_LENGTH), inline=False)
+    
+    # Resolution field (only if an image was generated)
+    if generated_image:
+        width, height = generated_image.size
+        pixel_count = width * height
+        embed.add_field(name="Resolution", value=f"{width}×{height} ({pixel_count:,} pixels)", inline=True)
     
-    await interaction.response.send_message(help_text)
+    # Aspect ratio field (if one was specified)
+    if aspect_ratio:
+        embed.add_field(name="Aspect Ratio", value=aspect_ratio, inline=True)
+    
+    # Model field
+    embed.add_field(name="Model", value=model_name_display, inline=True)
+    
+    # Reference output image inline in the embed
+    if image_filename:
+        embed.set_image(url=f"attachment://{image_filename}")
+    
+    # Footer with bot version and elapsed time
+    embed.set_footer(text=build_embed_footer(elapsed_seconds))
+    
+    # Small embeds for each input image used
+    input_embeds = []
+    for attachment in input_attachments:
+        input_embed = discord.Embed(color=INPUT_IMAGE_EMBED_COLOR)
+        input_embed.set_image(url=attachment.url)
+        input_embeds.append(input_embed)
+    
+    return input_embeds + [embed]
 
 
 async def run_image_command(
@@ -792,7 +1178,7 @@ async def run_image_command(
     
     if is_dm_channel(interaction.channel) and not usage_tracker.is_elevated_user(interaction.user.id):
         await interaction.response.send_message(
-            "❌ You don't have permission to use this bot in DMs. Only elevated users can use the bot in direct messages.",
+            DM_NOT_ALLOWED_MESSAGE,
             ephemeral=True
         )
         return
@@ -816,7 +1202,7 @@ async def run_image_command(
             )
         else:
             await interaction.response.send_message(
-                "⏰ You've reached your usage limit. Please try again later.",
+                USAGE_LIMIT_LATER_MESSAGE,
                 ephemeral=True
             )
         return
@@ -827,20 +1213,20 @@ async def run_image_command(
         start_time = time.monotonic()
         await interaction.response.defer()
         
-        attachments = [image_1, image_2, image_3, image_4]
-        images = await download_command_images(attachments, interaction)
+        # Drop unused attachment options once; the same list is reused for the input image embeds
+        input_attachments = [a for a in (image_1, image_2, image_3, image_4) if a is not None]
+        images = await download_command_images(input_attachments, interaction)
         if images is None:
             return
         
         aspect_ratio, cleaned_prompt = extract_aspect_ratio(prompt)
-        generated_image, text_response, usage_metadata = await generate_image_for_model(model_type, cleaned_prompt, images, aspect_ratio)
+        async with _generation_semaphore:
+            generated_image, text_response, usage_metadata = await generate_image_for_model(model_type, cleaned_prompt, images, aspect_ratio)
         
         if usage_metadata and not interaction.user.bot:
-            prompt_tokens = usage_metadata.get("prompt_token_count", 0)
-            output_tokens = usage_metadata.get("candidates_token_count", 0)
-            total_tokens = usage_metadata.get("total_token_count", 0)
+            prompt_tokens, output_tokens, total_tokens = usage_token_counts(usage_metadata)
             images_generated = 1 if generated_image else 0
-            usage_tracker.record_usage(
+            queue_usage_record(
                 user_id=interaction.user.id,
                 username=interaction.user.display_name or interaction.user.name,
                 prompt_tokens=prompt_tokens,
@@ -856,73 +1242,33 @@ async def run_image_command(
         file = None
         filename = None
         if generated_image:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{model_type}_{timestamp}.png"
-            filepath = os.path.join(config.GENERATED_IMAGES_DIR, filename)
-            generated_image.save(filepath)
-            img_buffer = io.BytesIO()
-            generated_image.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-            file = discord.File(img_buffer, filename=filename)
+            filename = build_image_filename(model_type)
+            image_data = await encode_png(generated_image)
+            queue_image_archive(image_data, filename)
+            file = discord.File(io.BytesIO(image_data), filename=filename)
         
         if not (text_response and text_response.strip()) and not file:
             await interaction.followup.send("I wasn't able to generate anything from your request. Please try again.")
             return
         
-        # Build response embed with image information
-        model_name_display = "Gemini" if model_type == "nanobanana" else "GPT Image 2"
-        embed = discord.Embed(color=discord.Color.blue())
-        
-        # Text response from model in embed description
-        # Skip description if it's just echoing the prompt (e.g. gpt-image), since the Prompt field already shows it
-        text_response_stripped = text_response.strip() if text_response else ""
-        is_prompt_echo = text_response_stripped and cleaned_prompt and text_response_stripped == cleaned_prompt.strip()
-        if text_response_stripped and not is_prompt_echo:
-            desc = text_response_stripped
-            if len(desc) > EMBED_DESCRIPTION_MAX_LENGTH:
-                desc = desc[:EMBED_DESCRIPTION_MAX_LENGTH - 3] + "..."
-            embed.description = desc
-        
-        # Prompt field
-        prompt_value = cleaned_prompt if cleaned_prompt and cleaned_prompt.strip() else "(no prompt)"
-        if len(prompt_value) > EMBED_FIELD_VALUE_MAX_LENGTH:
-            prompt_value = prompt_value[:EMBED_FIELD_VALUE_MAX_LENGTH - 3] + "..."
-        embed.add_field(name="Prompt", value=prompt_value, inline=False)
-        
-        # Resolution field (only if an image was generated)
-        if generated_image:
-            width, height = generated_image.size
-            pixel_count = width * height
-            embed.add_field(name="Resolution", value=f"{width}×{height} ({pixel_count:,} pixels)", inline=True)
-        
-        # Aspect ratio field (if one was specified)
-        if aspect_ratio:
-            embed.add_field(name="Aspect Ratio", value=aspect_ratio, inline=True)
-        
-        # Model field
-        embed.add_field(name="Model", value=model_name_display, inline=True)
-        
-        # Reference output image inline in the embed
-        if file:
-            embed.set_image(url=f"attachment://{filename}")
-        
-        # Footer with bot version and elapsed time
-        embed.set_footer(text=build_embed_footer(time.monotonic() - start_time))
-        
-        # Build small embeds for each input image used
-        input_attachments = [a for a in [image_1, image_2, image_3, image_4] if a is not None]
-        input_embeds = []
-        for attachment in input_attachments:
-            input_embed = discord.Embed(color=discord.Color.light_grey())
-            input_embed.set_image(url=attachment.url)
-            input_embeds.append(input_embed)
-        
-        embeds = input_embeds + [embed]
+        embeds = build_image_result_embeds(
+            model_type,
+            cleaned_prompt,
+            text_response,
+            generated_image,
+            aspect_ratio,
+            filename,
+            input_attachments,
+            time.monotonic() - start_time,
+        )
         
         if file:
             await interaction.followup.send(embeds=embeds, file=file)
         else:
             await interaction.followup.send(embeds=embeds)
+    except Exception as e:
+        logger.error("Error in %s image command: %s", model_type, e, exc_info=True)
+        await send_interaction_message(interaction, "An error occurred while generating your image. Please try again.")
     finally:
         if reserved_slots > 0 and not usage_consumed:
             usage_tracker.release_reserved_usage_slots(interaction.user.id, slots=reserved_slots)
@@ -967,6 +1313,11 @@ async def gpt_image_slash(
     """Generate/edit images with OpenAI gpt-image-2."""
     await run_image_command(interaction, "gpt", prompt, image_1, image_2, image_3, image_4)
 
+
+# Per-user fields shown by /usage; the tracker creates every user record with all of them
+USAGE_ROW_FIELDS = operator.itemgetter('username', 'total_tokens', 'images_generated')
+
+
 @bot.tree.command(name='usage', description='Show token usage statistics (elevated users only)')
 async def usage_slash(interaction: discord.Interaction):
     """Show token usage statistics (slash command) - elevated users only."""
@@ -974,10 +1325,10 @@ async def usage_slash(interaction: discord.Interaction):
         # Check if interaction is from a DM channel and user is not elevated
         if is_dm_channel(interaction.channel) and not usage_tracker.is_elevated_user(interaction.user.id):
             await interaction.response.send_message(
-                "❌ You don't have permission to use this bot in DMs. Only elevated users can use the bot in direct messages.",
+                DM_NOT_ALLOWED_MESSAGE,
                 ephemeral=True
             )
-            logger.info(f"Blocked non-elevated user {interaction.user.id} from using /usage in DM channel")
+            logger.info("Blocked non-elevated user %s from using /usage in DM channel", interaction.user.id)
             return
         
         # Check if the command caller has elevated status
@@ -995,37 +1346,33 @@ async def usage_slash(interaction: discord.Interaction):
             await interaction.response.send_message("No usage data available yet. Start using the bot to generate some statistics!")
             return
         
-        # Build the condensed response message
-        usage_text = "**🍌 Token Usage Statistics**\n\n"
-        
-        # Add overall stats (condensed)
-        usage_text += f"**📊 Overall:**\n"
-        usage_text += f"Total Users: {total_stats['total_users']} | "
-        usage_text += f"Total Tokens: {total_stats['total_tokens']:,} | "
-        usage_text += f"Images: {total_stats['total_images_generated']}\n\n"
-        
-        # Add all users with condensed info
-        usage_text += "**👤 Users:**\n"
+        # Build the condensed response message as a list of lines joined once at the end,
+        # so the text isn't re-copied for every user
+        lines = [
+            "**🍌 Token Usage Statistics**",
+            "",
+            # Add overall stats (condensed)
+            "**📊 Overall:**",
+            f"Total Users: {total_stats['total_users']} | "
+            f"Total Tokens: {total_stats['total_tokens']:,} | "
+            f"Images: {total_stats['total_images_generated']}",
+            "",
+            # Add all users with condensed info
+            "**👤 Users:**",
+        ]
         for i, (user_id, user_data) in enumerate(users_list, 1):
-            username = user_data.get('username', 'Unknown User')
-            total_tokens = user_data.get('total_tokens', 0)
-            images = user_data.get('images_generated', 0)
-            
-            # Get active usage count and tier for this user
-            user_id_int = int(user_id)
-            active_count = usage_tracker.get_daily_image_count(user_id_int)
-            user_tier = usage_tracker.get_user_tier(user_id_int)
+            username, total_tokens, images = USAGE_ROW_FIELDS(user_data)
             
-            # Get tier limit for display
-            from usage_tracker import TIER_LIMITS
-            tier_limit = TIER_LIMITS.get(user_tier, config.DAILY_IMAGE_LIMIT)
+            # Get active usage count, tier and tier limit for this user in one tracker read
+            active_count, user_tier, tier_limit = usage_tracker.get_image_quota_status(int(user_id))
             
             if user_tier == 'unlimited' or tier_limit == float('inf'):
                 usage_rate = f"{active_count}/∞"
             else:
                 usage_rate = f"{active_count}/{int(tier_limit)}"
             
-            usage_text += f"{i}. {username} ({user_tier}): {total_tokens:,} tokens, {images} images, {usage_rate} active\n"
+            lines.append(f"{i}. {username} ({user_tier}): {total_tokens:,} tokens, {images} images, {usage_rate} active")
+        usage_text = "\n".join(lines) + "\n"
         
         # Split message into chunks if needed and send
         chunks = split_long_message(usage_text)
@@ -1038,12 +1385,8 @@ async def usage_slash(interaction: discord.Interaction):
             await interaction.followup.send(chunk, ephemeral=True)
         
     except Exception as e:
-        logger.error(f"Error getting usage statistics: {e}")
-        # Check if we've already responded
-        if interaction.response.is_done():
-            await interaction.followup.send("An error occurred while retrieving usage statistics. Please try again.", ephemeral=True)
-        else:
-            await interaction.response.send_message("An error occurred while retrieving usage statistics. Please try again.", ephemeral=True)
+        logger.error("Error getting usage statistics: %s", e)
+        await send_interaction_message(interaction, "An error occurred while retrieving usage statistics. Please try again.")
 
 @bot.tree.command(name='log', description='Get the most recent log file (elevated users only)')
 async def log_slash(interaction: discord.Interaction):
@@ -1052,10 +1395,10 @@ async def log_slash(interaction: discord.Interaction):
         # Check if interaction is from a DM channel and user is not elevated
         if is_dm_channel(interaction.channel) and not usage_tracker.is_elevated_user(interaction.user.id):
             await interaction.response.send_message(
-                "❌ You don't have permission to use this bot in DMs. Only elevated users can use the bot in direct messages.",
+                DM_NOT_ALLOWED_MESSAGE,
                 ephemeral=True
             )
-            logger.info(f"Blocked non-elevated user {interaction.user.id} from using /log in DM channel")
+            logger.info("Blocked non-elevated user %s from using /log in DM channel", interaction.user.id)
             return
         
         # Check if the command caller has elevated status
@@ -1066,11 +1409,14 @@ async def log_slash(interaction: discord.Interaction):
             )
             return
         
+        # Acknowledge before looking up and reading the log file, which can outlast the 3s interaction deadline
+        await interaction.response.defer(ephemeral=True)
+        
         # Get the most recent log file
         log_file_path = log_manager.get_most_recent_log_file()
         
         if not log_file_path or not os.path.exists(log_file_path):
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 "📁 No log files found. The bot may not have generated any logs yet.",
                 ephemeral=True
             )
@@ -1082,7 +1428,7 @@ async def log_slash(interaction: discord.Interaction):
         
         # Discord has a file size limit of 8MB for non-premium servers
         if file_size > 8 * 1024 * 1024:  # 8MB
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"📁 **Log file too large**\n"
                 f"The log file `{file_name}` is {file_size / (1024*1024):.2f}MB, which exceeds Discord's file size limit. "
                 f"Please check the server's log directory directly.",
@@ -1091,30 +1437,24 @@ async def log_slash(interaction: discord.Interaction):
             return
         
         try:
-            # Send the log file
-            with open(log_file_path, 'rb') as file:
-                discord_file = discord.File(file, filename=file_name)
-                await interaction.response.send_message(
-                    f"📋 **Most Recent Log File**\n"
-                    f"Filename: `{file_name}`\n"
-                    f"Size: {file_size / 1024:.2f}KB",
-                    file=discord_file,
-                    ephemeral=True
-                )
-                logger.info(f"Elevated user {interaction.user.id} downloaded log file {file_name}")
-        except Exception as file_error:
-            logger.error(f"Error reading log file {log_file_path}: {file_error}")
-            await interaction.response.send_message(
-                "❌ Error reading the log file. Please try again later.",
+            # Read the log file off the event loop (it can be several MB), then send it
+            log_data = await asyncio.to_thread(Path(log_file_path).read_bytes)
+            discord_file = discord.File(io.BytesIO(log_data), filename=file_name)
+            await interaction.followup.send(
+                f"📋 **Most Recent Log File**\n"
+                f"Filename: `{file_name}`\n"
+                f"Size: {file_size / 1024:.2f}KB",
+                file=discord_file,
                 ephemeral=True
             )
+            logger.info("Elevated user %s downloaded log file %s", interaction.user.id, file_name)
+        except Exception as file_error:
+            logger.error("Error reading log file %s: %s", log_file_path, file_error)
+            await send_interaction_message(interaction, "❌ Error reading the log file. Please try again later.")
             
     except Exception as e:
-        logger.error(f"Error in log command: {e}")
-        await interaction.response.send_message(
-            "An error occurred while retrieving the log file. Please try again.",
-            ephemeral=True
-        )
+        logger.error("Error in log command: %s", e)
+        await send_interaction_message(interaction, "An error occurred while retrieving the log file. Please try again.")
 
 @bot.tree.command(name='reset', description='Reset cycle image usage for a user (elevated users only)')
 @app_commands.describe(user='The Discord user whose usage should be reset')
@@ -1124,10 +1464,10 @@ async def reset_slash(interaction: discord.Interaction, user: discord.User):
         # Check if interaction is from a DM channel and user is not elevated
         if is_dm_channel(interaction.channel) and not usage_tracker.is_elevated_user(interaction.user.id):
             await interaction.response.send_message(
-                "❌ You don't have permission to use this bot in DMs. Only elevated users can use the bot in direct messages.",
+                DM_NOT_ALLOWED_MESSAGE,
                 ephemeral=True
             )
-            logger.info(f"Blocked non-elevated user {interaction.user.id} from using /reset in DM channel")
+            logger.info("Blocked non-elevated user %s from using /reset in DM channel", interaction.user.id)
             return
         
         # Check if the command caller has elevated status
@@ -1138,6 +1478,9 @@ async def reset_slash(interaction: discord.Interaction, user: discord.User):
             )
             return
         
+        # Acknowledge before touching the usage file so slow disk I/O can't outlast the 3s interaction deadline
+        await interaction.response.defer(ephemeral=True)
+        
         # Attempt to reset the target user's usage
         success = usage_tracker.reset_daily_usage(user.id)
         
@@ -1146,25 +1489,22 @@ async def reset_slash(interaction: discord.Interaction, user: discord.User):
             new_count = usage_tracker.get_daily_image_count(user.id)
             username = user.display_name or user.name
             
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"✅ Successfully reset usage timestamps for **{username}** (ID: {user.id}). "
                 f"Their current active usage count is now {new_count}/{config.DAILY_IMAGE_LIMIT}.",
                 ephemeral=True
             )
-            logger.info(f"Elevated user {interaction.user.id} reset usage for user {user.id}")
+            logger.info("Elevated user %s reset usage for user %s", interaction.user.id, user.id)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"⚠️ Could not reset usage for **{user.display_name or user.name}** (ID: {user.id}). "
                 "This user may not have any recorded usage yet.",
                 ephemeral=True
             )
             
     except Exception as e:
-        logger.error(f"Error in reset command: {e}")
-        await interaction.response.send_message(
-            "An error occurred while resetting user usage. Please try again.",
-            ephemeral=True
-        )
+        logger.error("Error in reset command: %s", e)
+        await send_interaction_message(interaction, "An error occurred while resetting user usage. Please try again.")
 
 
 @bot.tree.command(name='tier', description='Assign a tier to a user (elevated users only)')
@@ -1172,23 +1512,17 @@ async def reset_slash(interaction: discord.Interaction, user: discord.User):
     user='The Discord user to assign a tier to',
     tier='The tier to assign (standard, limited, strict, extra, unlimited)'
 )
-@app_commands.choices(tier=[
-    app_commands.Choice(name='Standard (3 charges)', value='standard'),
-    app_commands.Choice(name='Limited (2 charges)', value='limited'),
-    app_commands.Choice(name='Strict (1 charge)', value='strict'),
-    app_commands.Choice(name='Extra (5 charges)', value='extra'),
-    app_commands.Choice(name='Unlimited', value='unlimited')
-])
+@app_commands.choices(tier=TIER_CHOICES)
 async def tier_slash(interaction: discord.Interaction, user: discord.User, tier: app_commands.Choice[str]):
     """Assign a tier to a user (elevated users only)."""
     try:
         # Check if interaction is from a DM channel and user is not elevated
         if is_dm_channel(interaction.channel) and not usage_tracker.is_elevated_user(interaction.user.id):
             await interaction.response.send_message(
-                "❌ You don't have permission to use this bot in DMs. Only elevated users can use the bot in direct messages.",
+                DM_NOT_ALLOWED_MESSAGE,
                 ephemeral=True
             )
-            logger.info(f"Blocked non-elevated user {interaction.user.id} from using /tier in DM channel")
+            logger.info("Blocked non-elevated user %s from using /tier in DM channel", interaction.user.id)
             return
         
         # Check if the command caller has elevated status
@@ -1199,13 +1533,15 @@ async def tier_slash(interaction: discord.Interaction, user: discord.User, tier:
             )
             return
         
+        # Acknowledge before touching the usage file so slow disk I/O can't outlast the 3s interaction deadline
+        await interaction.response.defer(ephemeral=True)
+        
         # Set the tier for the user
         username = user.display_name or user.name
         success = usage_tracker.set_user_tier(user.id, tier.value, username)
         
         if success:
             # Get tier details for display
-            from usage_tracker import TIER_LIMITS
             tier_limit = TIER_LIMITS.get(tier.value, 3)
             
             if tier.value == 'unlimited':
@@ -1213,23 +1549,28 @@ async def tier_slash(interaction: discord.Interaction, user: discord.User, tier:
             else:
                 limit_text = f"{int(tier_limit)} cycling charges"
             
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"✅ Successfully set **{username}** (ID: {user.id}) to **{tier.value}** tier with {limit_text}.",
                 ephemeral=True
             )
-            logger.info(f"Elevated user {interaction.user.id} set tier '{tier.value}' for user {user.id}")
+            logger.info("Elevated user %s set tier '%s' for user %s", interaction.user.id, tier.value, user.id)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"❌ Failed to set tier. Invalid tier value.",
                 ephemeral=True
             )
             
     except Exception as e:
-        logger.error(f"Error in tier command: {e}")
-        await interaction.response.send_message(
-            "An error occurred while setting user tier. Please try again.",
-            ephemeral=True
-        )
+        logger.error("Error in tier command: %s", e)
+        await send_interaction_message(interaction, "An error occurred while setting user tier. Please try again.")
+
+
+def build_avatar_message(emoji: str, template_name: str, text_response: Optional[str]) -> str:
+    """Build the message posted with a transformed avatar, including any model text."""
+    content = f"{emoji} **{template_name} Avatar Transformation**"
+    if text_response and text_response.strip():
+        content += f"\n\n{text_response}"
+    return content
 
 
 @bot.tree.command(name='avatar', description='Transform your avatar with a themed template')
@@ -1237,11 +1578,7 @@ async def tier_slash(interaction: discord.Interaction, user: discord.User, tier:
     template='The template theme to apply to your avatar',
     user='Optional: Use another user\'s avatar instead of your own'
 )
-@app_commands.choices(template=[
-    app_commands.Choice(name='Halloween', value='halloween'),
-    app_commands.Choice(name='Christmas', value='christmas'),
-    app_commands.Choice(name='New Year', value='newyear')
-])
+@app_commands.choices(template=AVATAR_TEMPLATE_CHOICES)
 async def avatar_slash(interaction: discord.Interaction, template: app_commands.Choice[str], user: Optional[discord.User] = None):
     """Transform user's avatar with a themed template."""
     reserved_slots = 0
@@ -1250,10 +1587,10 @@ async def avatar_slash(interaction: discord.Interaction, template: app_commands.
         # Check if interaction is from a DM channel and user is not elevated
         if is_dm_channel(interaction.channel) and not usage_tracker.is_elevated_user(interaction.user.id):
             await interaction.response.send_message(
-                "❌ You don't have permission to use this bot in DMs. Only elevated users can use the bot in direct messages.",
+                DM_NOT_ALLOWED_MESSAGE,
                 ephemeral=True
             )
-            logger.info(f"Blocked non-elevated user {interaction.user.id} from using /avatar in DM channel")
+            logger.info("Blocked non-elevated user %s from using /avatar in DM channel", interaction.user.id)
             return
         
         # Check usage limit
@@ -1276,7 +1613,7 @@ async def avatar_slash(interaction: discord.Interaction, template: app_commands.
                 )
             else:
                 await interaction.response.send_message(
-                    "⏰ You've reached your usage limit. Please try again later.",
+                    USAGE_LIMIT_LATER_MESSAGE,
                     ephemeral=True
                 )
             return
@@ -1290,7 +1627,24 @@ async def avatar_slash(interaction: discord.Interaction, template: app_commands.
         target_user = user if user else interaction.user
         avatar_url = target_user.display_avatar.url
         
-        logger.info(f"User {interaction.user.id} ({interaction.user.name}) requesting avatar transformation with template: {template.value} for user {target_user.id} ({target_user.name})")
+        logger.info("User %s (%s) requesting avatar transformation with template: %s for user %s (%s)", interaction.user.id, interaction.user.name, template.value, target_user.id, target_user.name)
+        
+        # Get the prompt and theme emoji based on the template
+        prompt, emoji = AVATAR_TEMPLATE_LOOKUP.get(
+            template.value, (AVATAR_TEMPLATE_LOOKUP['halloween'][0], '🎨')
+        )
+        
+        # Same avatar and template as an earlier request: resend that result. No model call is
+        # made, so the reserved slot is released unused in the finally block.
+        cached_result = get_cached_avatar_result(avatar_url, template.value)
+        if cached_result:
+            image_data, genai_text_response = cached_result
+            await interaction.followup.send(
+                content=build_avatar_message(emoji, template.name, genai_text_response),
+                file=discord.File(io.BytesIO(image_data), filename=build_image_filename(f"avatar_{template.value}"))
+            )
+            logger.info("Served cached %s avatar for user %s", template.value, target_user.id)
+            return
         
         # Download the target user's avatar
         avatar_image = await download_image(avatar_url)
@@ -1298,40 +1652,22 @@ async def avatar_slash(interaction: discord.Interaction, template: app_commands.
             await interaction.followup.send("❌ Failed to download the avatar. Please try again.")
             return
         
-        # Get the prompt based on the template
-        template_prompts = {
-            'halloween': "Modify this users avatar so that it is Halloween themed. Attempt to provide the subject of the avatar so that it is wearing a Halloween outfit that best suits the subject",
-            'christmas': "Christmasify this image",
-            'newyear': "Represent this image in a New Year's party setting for 2026"
-        }
-        
-        # Theme emojis for response messages
-        template_emojis = {
-            'halloween': '🎃',
-            'christmas': '🎄',
-            'newyear': '🎆'
-        }
-        
-        prompt = template_prompts.get(template.value, template_prompts['halloween'])
-        emoji = template_emojis.get(template.value, '🎨')
-        
         # Always use the default Gemini model
         generator = get_model_generator("nanobanana")
         
         # Generate the transformed avatar
-        generated_image, genai_text_response, usage_metadata = await generator.generate_image_from_text_and_image(
-            prompt, avatar_image
-        )
+        async with _generation_semaphore:
+            generated_image, genai_text_response, usage_metadata = await generator.generate_image_from_text_and_image(
+                prompt, avatar_image
+            )
         
         # Track usage (use interaction.user for tracking, not target_user)
         if usage_metadata and not interaction.user.bot:
             try:
-                prompt_tokens = usage_metadata.get("prompt_token_count", 0)
-                output_tokens = usage_metadata.get("candidates_token_count", 0)
-                total_tokens = usage_metadata.get("total_token_count", 0)
+                prompt_tokens, output_tokens, total_tokens = usage_token_counts(usage_metadata)
                 images_generated = 1 if generated_image else 0
                 
-                usage_tracker.record_usage(
+                queue_usage_record(
                     user_id=interaction.user.id,
                     username=interaction.user.display_name or interaction.user.name,
                     prompt_tokens=prompt_tokens,
@@ -1344,33 +1680,22 @@ async def avatar_slash(interaction: discord.Interaction, template: app_commands.
                 )
                 usage_consumed = images_generated > 0
             except Exception as e:
-                logger.warning(f"Could not track usage: {e}")
+                logger.warning("Could not track usage: %s", e)
         
         # Send the result
         if generated_image:
-            # Save the image
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"avatar_{template.value}_{timestamp}.png"
+            filename = build_image_filename(f"avatar_{template.value}")
             
-            # Save to disk
-            filepath = os.path.join(config.GENERATED_IMAGES_DIR, filename)
-            generated_image.save(filepath)
-            
-            # Save to buffer for Discord
-            img_buffer = io.BytesIO()
-            generated_image.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-            
-            # Prepare the message
-            content = f"{emoji} **{template.name} Avatar Transformation**"
-            if genai_text_response and genai_text_response.strip():
-                content += f"\n\n{genai_text_response}"
+            # Encode once for Discord and archive the same bytes in the background
+            image_data = await encode_png(generated_image)
+            queue_image_archive(image_data, filename)
+            cache_avatar_result(avatar_url, template.value, image_data, genai_text_response)
             
             await interaction.followup.send(
-                content=content,
-                file=discord.File(img_buffer, filename=filename)
+                content=build_avatar_message(emoji, template.name, genai_text_response),
+                file=discord.File(io.BytesIO(image_data), filename=filename)
             )
-            logger.info(f"Successfully generated {template.value} avatar for user {target_user.id}")
+            logger.info("Successfully generated %s avatar for user %s", template.value, target_user.id)
         else:
             error_msg = "❌ Failed to generate your transformed avatar. Please try again."
             if genai_text_response and genai_text_response.strip():
@@ -1378,15 +1703,11 @@ async def avatar_slash(interaction: discord.Interaction, template: app_commands.
             await interaction.followup.send(error_msg)
             
     except Exception as e:
-        logger.error(f"Error in avatar command: {e}")
+        logger.error("Error in avatar command: %s", e)
         try:
-            await interaction.followup.send(
-                "An error occurred while transforming your avatar. Please try again.",
-                ephemeral=True
-            )
-        except:
-            # If followup fails, try to send a regular response
-            pass
+            await send_interaction_message(interaction, "An error occurred while transforming your avatar. Please try again.")
+        except discord.DiscordException as discord_error:
+            logger.error("Could not send error message: %s", discord_error)
     finally:
         if reserved_slots > 0 and not usage_consumed:
             usage_tracker.release_reserved_usage_slots(interaction.user.id, slots=reserved_slots)
@@ -1468,7 +1789,7 @@ class WordplayAnswerModal(discord.ui.Modal, title="Submit Your Answer"):
                     ephemeral=True
                 )
                 # Don't remove session - let other users attempt it too
-                logger.info(f"User {interaction.user.id} solved wordplay puzzle correctly (message {self.message_id})")
+                logger.info("User %s solved wordplay puzzle correctly (message %s)", interaction.user.id, self.message_id)
             else:
                 # Incorrect answer
                 if session.has_attempts_remaining(interaction.user.id):
@@ -1478,7 +1799,7 @@ class WordplayAnswerModal(discord.ui.Modal, title="Submit Your Answer"):
                         f"Click the button again to try once more!",
                         ephemeral=True
                     )
-                    logger.info(f"User {interaction.user.id} incorrect wordplay answer, {attempts_left} attempts left (message {self.message_id})")
+                    logger.info("User %s incorrect wordplay answer, %s attempts left (message %s)", interaction.user.id, attempts_left, self.message_id)
                 else:
                     # No more attempts for this user
                     await interaction.response.send_message(
@@ -1489,34 +1810,41 @@ class WordplayAnswerModal(discord.ui.Modal, title="Submit Your Answer"):
                         ephemeral=True
                     )
                     # Don't remove session - let other users attempt it too
-                    logger.info(f"User {interaction.user.id} failed wordplay puzzle - no attempts remaining (message {self.message_id})")
+                    logger.info("User %s failed wordplay puzzle - no attempts remaining (message %s)", interaction.user.id, self.message_id)
+            
+            # Persist the attempt only after the reply has acknowledged the interaction,
+            # so the disk write never eats into Discord's 3-second response window
+            session_manager.save_sessions()
         
         except Exception as e:
-            logger.error(f"Error in wordplay answer modal: {e}", exc_info=True)
+            logger.error("Error in wordplay answer modal: %s", e, exc_info=True)
             await interaction.response.send_message(
                 "❌ An error occurred while checking your answer. Please try again.",
                 ephemeral=True
             )
 
 
-# View with button to open the modal
-class WordplayAnswerView(discord.ui.View):
-    """View with a button to submit an answer to the wordplay puzzle."""
+# Button that opens the modal. It is a DynamicItem so a single registration routes every
+# puzzle's button by custom_id, instead of discord.py holding one persistent view per puzzle.
+class WordplaySubmitButton(discord.ui.DynamicItem[discord.ui.Button], template=r'wordplay_submit_(?P<message_id>\d+)'):
+    """Submit Answer button for a wordplay puzzle message."""
     
     def __init__(self, message_id: int):
-        super().__init__(timeout=None)  # No timeout since puzzles don't expire
-        self.message_id = message_id
-        # Create button with unique custom_id
-        submit_button = discord.ui.Button(
-            label="Submit Answer",
-            style=discord.ButtonStyle.primary,
-            emoji="✍️",
-            custom_id=f"wordplay_submit_{message_id}"
+        super().__init__(
+            discord.ui.Button(
+                label="Submit Answer",
+                style=discord.ButtonStyle.primary,
+                emoji="✍️",
+                custom_id=f"wordplay_submit_{message_id}"
+            )
         )
-        submit_button.callback = self.submit_answer
-        self.add_item(submit_button)
+        self.message_id = message_id
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str]):
+        return cls(int(match['message_id']))
     
-    async def submit_answer(self, interaction: discord.Interaction):
+    async def callback(self, interaction: discord.Interaction):
         """Open the modal for submitting an answer."""
         # Check if there's an active session for this message
         session = session_manager.get_session(self.message_id)
@@ -1536,6 +1864,52 @@ class WordplayAnswerView(discord.ui.View):
         await interaction.response.send_modal(modal)
 
 
+bot.add_dynamic_items(WordplaySubmitButton)
+
+
+# View with button to open the modal
+class WordplayAnswerView(discord.ui.View):
+    """View with a button to submit an answer to the wordplay puzzle."""
+    
+    def __init__(self, message_id: int):
+        super().__init__(timeout=None)  # No timeout since puzzles don't expire
+        self.add_item(WordplaySubmitButton(message_id))
+
+
+# Fixed (name, value, inline) fields shown on every wordplay puzzle
+WORDPLAY_PUZZLE_FIELDS = (
+    ("📸 Image 1", "Represents one word", True),
+    ("📸 Image 2", "Represents another word", True),
+    ("How to answer:", "Click the 'Submit Answer' button below to enter your guess!", False),
+)
+
+
+def build_wordplay_puzzle_embed(num_letters: int, elapsed_seconds: float) -> discord.Embed:
+    """Build the embed posted with a new wordplay puzzle."""
+    # Prepare text for singular/plural handling
+    letter_text = f"{num_letters} additional letter{'s' if num_letters > 1 else ''}"
+    letter_plural = 's' if num_letters > 1 else ''
+    verb_form = 's' if num_letters == 1 else ''
+    
+    embed = discord.Embed(
+        title="🎯 Wordplay Puzzle",
+        description=(
+            f"**Two images, two words, {letter_text}!**\n\n"
+            "Look at the images below. Each represents a different word.\n"
+            f"One word is identical to the other except for **{letter_text}**.\n\n"
+            f"**Your task:** Find the extra letter{letter_plural} that turn{verb_form} the shorter word into the longer word.\n\n"
+            f"💡 **Hint:** The words differ by exactly {num_letters} letter{letter_plural}, and letter order stays the same.\n"
+            f"🎲 **Attempts:** 3 remaining\n"
+            f"🏆 **Reward:** 1 point for solving correctly!"
+        ),
+        color=RESULT_EMBED_COLOR
+    )
+    for name, value, inline in WORDPLAY_PUZZLE_FIELDS:
+        embed.add_field(name=name, value=value, inline=inline)
+    embed.set_footer(text=build_embed_footer(elapsed_seconds))
+    return embed
+
+
 @bot.tree.command(name='wordplay', description='Play a wordplay puzzle - guess the extra letter!')
 @app_commands.describe(
     word_length='Minimum length for the shorter word (default: 4)',
@@ -1579,10 +1953,10 @@ async def wordplay_slash(
         # Check if interaction is from a DM channel and user is not elevated
         if is_dm_channel(interaction.channel) and not usage_tracker.is_elevated_user(interaction.user.id):
             await interaction.response.send_message(
-                "❌ You don't have permission to use this bot in DMs. Only elevated users can use the bot in direct messages.",
+                DM_NOT_ALLOWED_MESSAGE,
                 ephemeral=True
             )
-            logger.info(f"Blocked non-elevated user {interaction.user.id} from using /wordplay in DM channel")
+            logger.info("Blocked non-elevated user %s from using /wordplay in DM channel", interaction.user.id)
             return
         
         # Reserve usage slots up front to prevent over-queueing
@@ -1605,7 +1979,7 @@ async def wordplay_slash(
                 )
             else:
                 await interaction.response.send_message(
-                    "⏰ You've reached your usage limit. Please try again later.",
+                    USAGE_LIMIT_LATER_MESSAGE,
                     ephemeral=True
                 )
             return
@@ -1630,18 +2004,29 @@ async def wordplay_slash(
                 "❌ Failed to generate a word puzzle. Please try again.",
                 ephemeral=True
             )
-            logger.error(f"Failed to generate word pair for user {interaction.user.id}")
+            logger.error("Failed to generate word pair for user %s", interaction.user.id)
             return
         
         shorter_word, longer_word, extra_letters = word_pair
-        logger.info(f"Generated word pair for {interaction.user.id}: {shorter_word} -> {longer_word} (extra: {extra_letters})")
+        logger.info("Generated word pair for %s: %s -> %s (extra: %s)", interaction.user.id, shorter_word, longer_word, extra_letters)
         
         # Generate images for both words using the selected model
         image_model_name = model.name if model is not None else "Gemini Flash Image (gemini-2.5-flash-image)"
+        # Post the status message first, so a failed send stops us before any paid image generation
         status_msg = await interaction.followup.send(f"🎨 Generating puzzle images using {image_model_name}...", wait=True)
         
-        image1 = await generate_word_image(image_generator, shorter_word, style, text_generator=text_generator)
-        image2 = await generate_word_image(image_generator, longer_word, style, text_generator=text_generator)
+        try:
+            async with _generation_semaphore:
+                image1 = await generate_word_image(image_generator, shorter_word, style, text_generator=text_generator)
+            async with _generation_semaphore:
+                image2 = await generate_word_image(image_generator, longer_word, style, text_generator=text_generator)
+        except Exception:
+            # Don't leave the "Generating..." message up when generation itself fails
+            try:
+                await status_msg.delete()
+            except (discord.NotFound, discord.HTTPException) as e:
+                logger.warning("Could not delete status message: %s", e)
+            raise
         
         # Check if both images were generated successfully
         if not image1 or not image2:
@@ -1649,30 +2034,24 @@ async def wordplay_slash(
             try:
                 await status_msg.delete()
             except (discord.NotFound, discord.HTTPException) as e:
-                logger.warning(f"Could not delete status message: {e}")
+                logger.warning("Could not delete status message: %s", e)
             
             await interaction.followup.send(
                 "❌ Failed to generate puzzle images. Please try again.",
                 ephemeral=True
             )
-            logger.error(f"Failed to generate images for word pair: {shorter_word}, {longer_word}")
+            logger.error("Failed to generate images for word pair: %s, %s", shorter_word, longer_word)
             return
         
-        # Delete the status message before showing the puzzle
-        try:
-            await status_msg.delete()
-        except (discord.NotFound, discord.HTTPException) as e:
-            logger.warning(f"Could not delete status message: {e}")
-        
-        # Generate a unique puzzle ID with microseconds to ensure uniqueness
-        puzzle_id = f"{interaction.user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        # Generate a unique puzzle ID from the nanosecond clock (no datetime/strftime formatting)
+        puzzle_id = f"{interaction.user.id}_{time.time_ns()}"
         
         # Record usage for rate limiting
         # Note: Token counting is handled internally by the model generator.
         # For wordplay, we primarily track image generation count for rate limiting.
         # The wordplay command uses the 8-hour cycling rate limit based on images_generated,
         # not token consumption, so token counts are intentionally set to 0.
-        usage_tracker.record_usage(
+        queue_usage_record(
             user_id=interaction.user.id,
             username=interaction.user.display_name or interaction.user.name,
             prompt_tokens=0,
@@ -1685,106 +2064,47 @@ async def wordplay_slash(
         )
         usage_consumed = True
         
-        # Save images to buffers for Discord
-        img1_buffer = io.BytesIO()
-        img2_buffer = io.BytesIO()
-        image1.save(img1_buffer, format='PNG')
-        image2.save(img2_buffer, format='PNG')
-        img1_buffer.seek(0)
-        img2_buffer.seek(0)
+        # Encode images for Discord
+        image1_data, image2_data = await asyncio.gather(encode_png(image1), encode_png(image2))
         
         # Save images to disk with randomized filenames to avoid revealing the words
         filename1 = f"wordplay_{uuid.uuid4().hex}.png"
         filename2 = f"wordplay_{uuid.uuid4().hex}.png"
         
-        filepath1 = os.path.join(config.GENERATED_IMAGES_DIR, filename1)
-        filepath2 = os.path.join(config.GENERATED_IMAGES_DIR, filename2)
-        image1.save(filepath1)
-        image2.save(filepath2)
+        queue_image_archive(image1_data, filename1)
+        queue_image_archive(image2_data, filename2)
         
         # Create Discord files
-        file1 = discord.File(img1_buffer, filename=filename1)
-        file2 = discord.File(img2_buffer, filename=filename2)
-        
-        # Create embed with puzzle (we'll update attempts count after creating session)
-        # Prepare text for singular/plural handling
-        letter_text = f"{num_letters} additional letter{'s' if num_letters > 1 else ''}"
-        letter_plural = 's' if num_letters > 1 else ''
-        verb_form = 's' if num_letters == 1 else ''
-        
-        embed = discord.Embed(
-            title="🎯 Wordplay Puzzle",
-            description=(
-                f"**Two images, two words, {letter_text}!**\n\n"
-                "Look at the images below. Each represents a different word.\n"
-                f"One word is identical to the other except for **{letter_text}**.\n\n"
-                f"**Your task:** Find the extra letter{letter_plural} that turn{verb_form} the shorter word into the longer word.\n\n"
-                f"💡 **Hint:** The words differ by exactly {num_letters} letter{letter_plural}, and letter order stays the same.\n"
-                f"🎲 **Attempts:** 3 remaining\n"
-                f"🏆 **Reward:** 1 point for solving correctly!"
-            ),
-            color=discord.Color.blue()
-        )
+        file1 = discord.File(io.BytesIO(image1_data), filename=filename1)
+        file2 = discord.File(io.BytesIO(image2_data), filename=filename2)
         
-        embed.add_field(
-            name="📸 Image 1",
-            value="Represents one word",
-            inline=True
-        )
-        embed.add_field(
-            name="📸 Image 2",
-            value="Represents another word",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="How to answer:",
-            value="Click the 'Submit Answer' button below to enter your guess!",
-            inline=False
-        )
+        embed = build_wordplay_puzzle_embed(num_letters, time.monotonic() - start_time)
         
-        embed.set_footer(text=build_embed_footer(time.monotonic() - start_time))
-        
-        # Send the puzzle first to get the message ID
-        puzzle_message = await interaction.followup.send(
-            embed=embed,
-            files=[file1, file2],
-            wait=True
-        )
-        
-        # Now create session with the message ID
-        session = session_manager.create_session(
-            puzzle_message.id,
+        # The status message's ID is known already, so create the session for it and turn the
+        # status message into the puzzle (embed, images and answer button) with a single edit
+        session_manager.create_session(
+            status_msg.id,
             interaction.user.id,
             shorter_word,
             longer_word,
             extra_letters,
             puzzle_id
         )
+        await status_msg.edit(
+            content=None,
+            embed=embed,
+            attachments=[file1, file2],
+            view=WordplayAnswerView(status_msg.id)
+        )
         
-        # Create view with answer button that has the message_id
-        view = WordplayAnswerView(puzzle_message.id)
-        
-        # Edit the message to add the view
-        await puzzle_message.edit(view=view)
-        
-        logger.info(f"Wordplay puzzle sent to user {interaction.user.id}")
+        logger.info("Wordplay puzzle sent to user %s", interaction.user.id)
         
     except Exception as e:
-        logger.error(f"Error in wordplay command: {e}", exc_info=True)
+        logger.error("Error in wordplay command: %s", e, exc_info=True)
         try:
-            if interaction.response.is_done():
-                await interaction.followup.send(
-                    "❌ An error occurred while creating the puzzle. Please try again.",
-                    ephemeral=True
-                )
-            else:
-                await interaction.response.send_message(
-                    "❌ An error occurred while creating the puzzle. Please try again.",
-                    ephemeral=True
-                )
+            await send_interaction_message(interaction, "❌ An error occurred while creating the puzzle. Please try again.")
         except discord.DiscordException as discord_error:
-            logger.error(f"Could not send error message: {discord_error}")
+            logger.error("Could not send error message: %s", discord_error)
     finally:
         if reserved_slots > 0 and not usage_consumed:
             usage_tracker.release_reserved_usage_slots(interaction.user.id, slots=reserved_slots)
@@ -1804,6 +2124,11 @@ def main():
         logger.error("OPENAI_API_KEY not found in environment variables")
         return
     
+    if UVLOOP_AVAILABLE:
+        # Must be set before bot.run creates the event loop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+    
     logger.info("Starting Discord Bot...")
     bot.run(config.DISCORD_TOKEN)
 
@@ -24,21 +24,26 @@ COMMAND_PREFIX = '!'
 MAX_IMAGE_SIZE = 8 * 1024 * 1024  # 8MB max per image
 MAX_IMAGES = 10  # Maximum number of images to process
 GENERATED_IMAGES_DIR = 'generated_images'
+WORDPLAY_SESSIONS_FILE = os.path.join(GENERATED_IMAGES_DIR, 'wordplay_sessions.json')  # Open wordplay puzzles, kept across restarts
+MAX_CONCURRENT_GENERATIONS = int(os.getenv('MAX_CONCURRENT_GENERATIONS', '4'))  # Image generation calls allowed in flight at once
+MAX_CONCURRENT_CHAT_RESPONSES = int(os.getenv('MAX_CONCURRENT_CHAT_RESPONSES', '8'))  # Chat (mention/reply) model calls allowed in flight at once
+IMAGE_CACHE_SIZE = int(os.getenv('IMAGE_CACHE_SIZE', '16'))  # Recently downloaded input images kept in memory
+AVATAR_CACHE_SIZE = int(os.getenv('AVATAR_CACHE_SIZE', '32'))  # Finished /avatar transformations kept in memory
 
 # Rate limiting configuration
 DAILY_IMAGE_LIMIT = 3  # Maximum images per user (each with independent 8-hour timer)
 
 # Elevated users configuration (Discord IDs)
-# Users in this list are not bound by usage limitations and can use special commands
+# Users in this set are not bound by usage limitations and can use special commands
 # Read from environment variable as comma-separated list
 _elevated_users_str = os.getenv('ELEVATED_USERS', '')
-ELEVATED_USERS = []
+ELEVATED_USERS = frozenset()
 if _elevated_users_str.strip():
     try:
-        ELEVATED_USERS = [int(user_id.strip()) for user_id in _elevated_users_str.split(',') if user_id.strip()]
+        ELEVATED_USERS = frozenset(int(user_id.strip()) for user_id in _elevated_users_str.split(',') if user_id.strip())
     except ValueError:
         print("Warning: Invalid ELEVATED_USERS format in environment variable. Expected comma-separated integers.")
-        ELEVATED_USERS = []
+        ELEVATED_USERS = frozenset()
 
 # Logs configuration
 LOGS_DIR = 'logs'
@@ -1,22 +1,172 @@
 import io
+import asyncio
+import weakref
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 import aiohttp
 from PIL import Image
 import logging
 
+import config
+
 logger = logging.getLogger(__name__)
 
+# zlib level for PNGs uploaded to Discord (and archived from the same bytes). Level 1
+# encodes several times faster than Pillow's default (6) for only slightly larger files.
+DISCORD_PNG_COMPRESS_LEVEL = 1
+# zlib level for input images sent to model APIs (Pillow's default), where smaller payloads matter more
+API_PNG_COMPRESS_LEVEL = 6
+
+# Encoded API payloads for live input images, keyed by id(image). Each entry is dropped when
+# its image is garbage collected, so only the images of in-flight requests have one.
+_api_png_cache = {}
+
+# Recently downloaded input images, least recently used first, so replying to or mentioning
+# the same image again skips the download and decode. Callers only ever get copies, so
+# nothing can mutate a cached image and each request encodes its own images.
+_image_cache: "OrderedDict[str, Image.Image]" = OrderedDict()
+# Query parameters Discord's CDN adds to sign attachment URLs; they change over time
+# while the file stays the same, so they are left out of cache keys for Discord's CDN hosts
+_DISCORD_SIGNATURE_PARAMS = frozenset(('ex', 'is', 'hm'))
+_DISCORD_CDN_HOSTS = frozenset(('cdn.discordapp.com', 'media.discordapp.net'))
+
+
+def _image_cache_key(url: str) -> str:
+    """Return url, minus Discord's expiring signature parameters if it is a Discord CDN URL."""
+    parts = urlsplit(url)
+    if not parts.query or parts.hostname not in _DISCORD_CDN_HOSTS:
+        return url
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _DISCORD_SIGNATURE_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _get_cached_image(url: str):
+    """Return the cached image for url (marking it recently used), or None."""
+    key = _image_cache_key(url)
+    image = _image_cache.get(key)
+    if image is not None:
+        _image_cache.move_to_end(key)
+    return image
+
+
+def _cache_image(url: str, image: Image.Image) -> None:
+    """Cache image under url, evicting the least recently used entries beyond IMAGE_CACHE_SIZE."""
+    key = _image_cache_key(url)
+    _image_cache[key] = image
+    _image_cache.move_to_end(key)
+    while len(_image_cache) > config.IMAGE_CACHE_SIZE:
+        _image_cache.popitem(last=False)
+
+
+def _open_image(image_data: bytes) -> Image.Image:
+    """Decode image bytes fully (blocking), so a cached image is never lazily loaded by two threads."""
+    image = Image.open(io.BytesIO(image_data))
+    image.load()
+    return image
+
+# One HTTP session shared by all downloads so connections (and TLS handshakes) to the same
+# hosts are reused. It belongs to the event loop that created it, so a new loop gets a new one.
+# The bot closes it on shutdown with close_http_session().
+_http_session: Optional[aiohttp.ClientSession] = None
+_http_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared download session, creating it on first use in the running loop."""
+    global _http_session, _http_session_loop
+    loop = asyncio.get_running_loop()
+    if _http_session is not None and not _http_session.closed and _http_session_loop is not loop:
+        # Left open by a loop that ended without close_http_session(); close it before replacing it
+        await close_http_session()
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit_per_host=16, ttl_dns_cache=300))
+        _http_session_loop = loop
+    return _http_session
+
+
+async def close_http_session() -> None:
+    """Close the shared download session, if one is open."""
+    global _http_session, _http_session_loop
+    session, _http_session, _http_session_loop = _http_session, None, None
+    if session is None or session.closed:
+        return
+    try:
+        await session.close()
+    except RuntimeError as e:
+        # Pooled connections of a session from an already closed loop can't all be shut down
+        # from another loop; detach the connector so the session is at least marked closed
+        logger.warning(f"Could not cleanly close stale HTTP session: {e}")
+        session.detach()
+
+
 async def download_image(url: str) -> Image.Image:
-    """Download an image from a URL and return as PIL Image."""
+    """Download an image from a URL and return it as a PIL Image the caller may modify freely."""
+    cached = _get_cached_image(url)
+    if cached is not None:
+        return await asyncio.to_thread(cached.copy)
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    image_data = await response.read()
-                    return Image.open(io.BytesIO(image_data))
-                else:
-                    logger.error(f"Failed to download image: {response.status}")
-                    return None
+        session = await get_http_session()
+        async with session.get(url) as response:
+            if response.status == 200:
+                image_data = await response.read()
+                image = await asyncio.to_thread(_open_image, image_data)
+                _cache_image(url, image)
+                return await asyncio.to_thread(image.copy)
+            else:
+                logger.error(f"Failed to download image: {response.status}")
+                return None
     except Exception as e:
         logger.error(f"Error downloading image: {e}")
         return None
 
+
+async def download_attachment_image(attachment) -> Image.Image:
+    """
+    Read a Discord attachment and return it as a PIL Image.
+    
+    Uses discord.py's own HTTP session, so the download reuses its pooled keep-alive
+    connections to Discord's CDN instead of opening a new session per image.
+    Like download_image, it returns a copy of the cached image.
+    """
+    cached = _get_cached_image(attachment.url)
+    if cached is not None:
+        return await asyncio.to_thread(cached.copy)
+    try:
+        image_data = await attachment.read()
+        image = await asyncio.to_thread(_open_image, image_data)
+        _cache_image(attachment.url, image)
+        return await asyncio.to_thread(image.copy)
+    except Exception as e:
+        logger.error(f"Error downloading attachment {attachment.filename}: {e}")
+        return None
+
+
+def _encode_png(image: Image.Image, compress_level: int) -> bytes:
+    """Encode a PIL Image as PNG bytes (blocking)."""
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', compress_level=compress_level)
+    return buffer.getvalue()
+
+
+async def encode_png(image: Image.Image, compress_level: int = DISCORD_PNG_COMPRESS_LEVEL) -> bytes:
+    """Encode a PIL Image as PNG bytes in a worker thread so the event loop stays responsive."""
+    return await asyncio.to_thread(_encode_png, image, compress_level)
+
+
+async def encode_png_for_api(image: Image.Image) -> bytes:
+    """
+    Return PNG bytes for an input image sent to a model API, encoding it only once.
+    
+    When the same image is passed to several API calls in one request (e.g. chat, then the
+    image tool) the first encoding is reused. The cache is keyed by id(image), so an image
+    must not be modified in place after it is first passed here; make a copy to change it.
+    Encoding runs in a worker thread so the event loop stays responsive.
+    """
+    key = id(image)
+    image_data = _api_png_cache.get(key)
+    if image_data is None:
+        image_data = await asyncio.to_thread(_encode_png, image, API_PNG_COMPRESS_LEVEL)
+        _api_png_cache[key] = image_data
+        weakref.finalize(image, _api_png_cache.pop, key, None)
+    return image_data
@@ -16,7 +16,7 @@ from google.genai import types
 from openai import OpenAI
 from typing import Optional, List, Tuple, Dict, Any, Union, Callable, Awaitable
 import config
-from image_utils import download_image
+from image_utils import download_image, encode_png_for_api
 
 logger = logging.getLogger(__name__)
 
@@ -155,9 +155,7 @@ class GeminiModelGenerator(BaseModelGenerator):
         """Generate an image from both text prompt and input image(s)."""
         try:
             # Convert PIL Image to bytes for API
-            img_buffer = io.BytesIO()
-            input_image.save(img_buffer, format='PNG')
-            img_bytes = img_buffer.getvalue()
+            img_bytes = await encode_png_for_api(input_image)
             
             # Create Part from bytes for primary image
             image_part = types.Part.from_bytes(
@@ -171,9 +169,7 @@ class GeminiModelGenerator(BaseModelGenerator):
             # Add additional images if provided
             if additional_images:
                 for add_image in additional_images:
-                    add_img_buffer = io.BytesIO()
-                    add_image.save(add_img_buffer, format='PNG')
-                    add_img_bytes = add_img_buffer.getvalue()
+                    add_img_bytes = await encode_png_for_api(add_image)
                     
                     add_image_part = types.Part.from_bytes(
                         data=add_img_bytes,
@@ -222,9 +218,7 @@ class GeminiModelGenerator(BaseModelGenerator):
             if input_images:
                 contents = [prompt]
                 for image in input_images:
-                    img_buffer = io.BytesIO()
-                    image.save(img_buffer, format='PNG')
-                    img_bytes = img_buffer.getvalue()
+                    img_bytes = await encode_png_for_api(image)
                     
                     image_part = types.Part.from_bytes(
                         data=img_bytes,
@@ -307,9 +301,7 @@ class GPTModelGenerator(BaseModelGenerator):
 
             content_parts = [{"type": "input_text", "text": prompt}]
             for input_image in input_images:
-                img_buffer = io.BytesIO()
-                input_image.save(img_buffer, format='PNG')
-                image_base64 = base64.b64encode(img_buffer.getvalue()).decode("utf-8")
+                image_base64 = base64.b64encode(await encode_png_for_api(input_image)).decode("utf-8")
                 content_parts.append(
                     {
                         "type": "input_image",
@@ -672,16 +664,10 @@ class ChatModelGenerator(BaseModelGenerator):
 
     async def _download_tool_result_images(self, image_urls: List[str]) -> List[Image.Image]:
         """Download unique tool-result image URLs for reuse in image-generation tool calls."""
-        images: List[Image.Image] = []
-        seen_urls = set()
-        for image_url in image_urls:
-            if not image_url or image_url in seen_urls:
-                continue
-            seen_urls.add(image_url)
-            image = await download_image(image_url)
-            if image:
-                images.append(image)
-        return images
+        # dict.fromkeys de-duplicates while keeping first-seen order; downloads run concurrently
+        unique_urls = [url for url in dict.fromkeys(image_urls) if url]
+        downloaded = await asyncio.gather(*(download_image(url) for url in unique_urls))
+        return [image for image in downloaded if image]
 
     async def _execute_image_generation_tool(self, prompt: str, model: str, input_images: Optional[List[Image.Image]] = None) -> Tuple[Optional[Image.Image], Optional[str], Optional[Dict[str, Any]]]:
         """Execute the image generation tool using the specified model ('gemini' or 'gpt').
@@ -742,9 +728,7 @@ class ChatModelGenerator(BaseModelGenerator):
             if input_images:
                 content: Union[str, List[Dict[str, Any]]] = [{"type": "text", "text": prompt}]
                 for image in input_images:
-                    img_buffer = io.BytesIO()
-                    image.save(img_buffer, format='PNG')
-                    image_base64 = base64.b64encode(img_buffer.getvalue()).decode("utf-8")
+                    image_base64 = base64.b64encode(await encode_png_for_api(image)).decode("utf-8")
                     content.append({
                         "type": "image_url",
                         "image_url": {
@@ -885,15 +869,29 @@ class ChatModelGenerator(BaseModelGenerator):
         return await self._generate_text_response(prompt, input_images, tool_executor, allow_image_generation=allow_image_generation)
 
 
+# Generator instances are created once per class and reused, so each API client (and its
+# connection pool) lives for the life of the process instead of being rebuilt per request.
+_generator_instances: Dict[type, BaseModelGenerator] = {}
+
+
+def _get_generator_instance(generator_class: type) -> BaseModelGenerator:
+    """Return the shared instance of generator_class, creating it on first use."""
+    generator = _generator_instances.get(generator_class)
+    if generator is None:
+        generator = generator_class()
+        _generator_instances[generator_class] = generator
+    return generator
+
+
 # Factory function to get the appropriate generator
 def get_model_generator(model_type: str) -> BaseModelGenerator:
-    """Get the appropriate model generator based on model type."""
+    """Get the shared model generator for the given model type."""
     if model_type in ("nanobanana", "gemini"):
-        return GeminiModelGenerator()
+        return _get_generator_instance(GeminiModelGenerator)
     elif model_type == "gpt":
-        return GPTModelGenerator()
+        return _get_generator_instance(GPTModelGenerator)
     elif model_type == "chat":
-        return ChatModelGenerator()
+        return _get_generator_instance(ChatModelGenerator)
     else:
         logger.warning(f"Unknown model type '{model_type}', defaulting to 'nanobanana'")
-        return GeminiModelGenerator()
+        return _get_generator_instance(GeminiModelGenerator)
@@ -1,5 +1,10 @@
+import asyncio
+import os
 import subprocess
+import tempfile
 import unittest
+from collections import OrderedDict
+from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -7,6 +12,20 @@ import discord
 import bot
 
 
+_sessions_dir = None
+
+
+def setUpModule():
+    # Keep any wordplay sessions the handlers save out of the real sessions file
+    global _sessions_dir
+    _sessions_dir = tempfile.TemporaryDirectory()
+    bot.session_manager.storage_file = os.path.join(_sessions_dir.name, "wordplay_sessions.json")
+
+
+def tearDownModule():
+    _sessions_dir.cleanup()
+
+
 class TestGetGitCommitHash(unittest.TestCase):
     def test_returns_7_char_hash_on_success(self):
         mock_result = MagicMock()
@@ -56,6 +75,74 @@ class TestFormatElapsedTime(unittest.TestCase):
         self.assertEqual(bot.format_elapsed_time(97.6), "98s")
 
 
+class TestTruncateText(unittest.TestCase):
+    def test_short_text_unchanged(self):
+        self.assertEqual(bot.truncate_text("hello", 5), "hello")
+
+    def test_long_text_truncated_to_limit(self):
+        result = bot.truncate_text("abcdefghij", 8)
+        self.assertEqual(result, "abcde...")
+        self.assertEqual(len(result), 8)
+
+
+class TestSplitLongMessage(unittest.TestCase):
+    def test_short_message_returned_whole(self):
+        self.assertEqual(bot.split_long_message("hello", max_length=20), ["hello"])
+        self.assertEqual(bot.split_long_message("", max_length=20), [])
+
+    def test_prefers_paragraph_then_word_boundaries(self):
+        content = "first paragraph here\n\nsecond paragraph words go on"
+
+        chunks = bot.split_long_message(content, max_length=30)
+
+        self.assertEqual(chunks, ["first paragraph here", "second paragraph words go on"])
+
+    def test_forces_split_without_boundaries(self):
+        chunks = bot.split_long_message("x" * 25, max_length=10)
+
+        self.assertEqual(chunks, ["x" * 10, "x" * 10, "x" * 5])
+
+    def test_leading_whitespace_stripped_when_only_trailing_whitespace_overflows(self):
+        chunks = bot.split_long_message("   hello world" + " " * 20, max_length=20)
+
+        self.assertEqual(chunks, ["hello world"])
+
+
+class TestExtractAspectRatio(unittest.TestCase):
+    def test_valid_ratio_removed_from_prompt(self):
+        self.assertEqual(bot.extract_aspect_ratio("a  cat -16:9 on a mat"), ("16:9", "a cat on a mat"))
+
+    def test_invalid_or_missing_ratio_leaves_text_untouched(self):
+        self.assertEqual(bot.extract_aspect_ratio("a cat -7:3"), (None, "a cat -7:3"))
+        self.assertEqual(bot.extract_aspect_ratio("a cat"), (None, "a cat"))
+
+
+class TestExtractTextFromMessage(unittest.TestCase):
+    def test_strips_both_bot_mention_forms_and_keeps_other_mentions(self):
+        msg = MagicMock(content="<@42> hi <@!42> ask <@7>")
+        with patch.object(bot, "bot", MagicMock(user=MagicMock(id=42))):
+            text = bot.extract_text_from_message(msg)
+
+        self.assertEqual(text, "hi  ask <@7>")
+
+
+class TestIsDirectlyMentioned(unittest.TestCase):
+    def _message(self, content, mentioned_ids):
+        msg = _make_message(content=content)
+        msg.mentions = [MagicMock(id=user_id) for user_id in mentioned_ids]
+        return msg
+
+    def test_matches_both_mention_forms_only_for_the_given_user(self):
+        self.assertTrue(bot.is_directly_mentioned(self._message("hey <@42>", [42]), 42))
+        self.assertTrue(bot.is_directly_mentioned(self._message("hey <@!42>", [42]), 42))
+        self.assertFalse(bot.is_directly_mentioned(self._message("hey <@420>", [420]), 42))
+        self.assertFalse(bot.is_directly_mentioned(self._message("hey 42", []), 42))
+
+    def test_reply_ping_alone_is_not_a_direct_mention(self):
+        """A pinging reply lists the replied-to author in mentions without naming them in the text."""
+        self.assertFalse(bot.is_directly_mentioned(self._message("nice picture", [42]), 42))
+
+
 class TestBuildEmbedFooter(unittest.TestCase):
     def test_with_commit_hash(self):
         with patch.object(bot, "_git_commit_hash", "b97f08e"):
@@ -73,6 +160,265 @@ class TestBuildEmbedFooter(unittest.TestCase):
         self.assertEqual(result, "ZPT | Thought for 5s")
 
 
+def _make_interaction(response_done=False):
+    """Create a minimal mock Discord interaction."""
+    interaction = MagicMock()
+    interaction.response.is_done.return_value = response_done
+    interaction.response.send_message = AsyncMock()
+    interaction.followup.send = AsyncMock()
+    return interaction
+
+
+class TestSendInteractionMessage(unittest.IsolatedAsyncioTestCase):
+    async def test_uses_initial_response_when_not_done(self):
+        interaction = _make_interaction(response_done=False)
+        await bot.send_interaction_message(interaction, "hello")
+        interaction.response.send_message.assert_awaited_once_with("hello", ephemeral=True)
+        interaction.followup.send.assert_not_called()
+
+    async def test_uses_followup_when_response_done(self):
+        interaction = _make_interaction(response_done=True)
+        await bot.send_interaction_message(interaction, "hello", ephemeral=False)
+        interaction.followup.send.assert_awaited_once_with("hello", ephemeral=False)
+        interaction.response.send_message.assert_not_called()
+
+    async def test_expired_interaction_token_is_ignored(self):
+        interaction = _make_interaction(response_done=True)
+        response = MagicMock(status=401, reason="Unauthorized")
+        interaction.followup.send.side_effect = discord.HTTPException(
+            response, {"code": 50027, "message": "Invalid Webhook Token"}
+        )
+        await bot.send_interaction_message(interaction, "hello")
+
+    async def test_other_http_errors_are_raised(self):
+        interaction = _make_interaction(response_done=True)
+        response = MagicMock(status=500, reason="Server Error")
+        interaction.followup.send.side_effect = discord.HTTPException(response, "boom")
+        with self.assertRaises(discord.HTTPException):
+            await bot.send_interaction_message(interaction, "hello")
+
+
+class TestUsageTokenCounts(unittest.TestCase):
+    def test_reads_counts_and_defaults_missing_to_zero(self):
+        metadata = {"prompt_token_count": 12, "total_token_count": 30, "image_model_used": "gpt"}
+        self.assertEqual(bot.usage_token_counts(metadata), (12, 0, 30))
+
+
+class TestBuildHelpText(unittest.TestCase):
+    def test_fills_in_bot_name_and_mention(self):
+        text = bot.build_help_text("Banana", "<@42>")
+
+        self.assertTrue(text.startswith("**Banana - Help**"))
+        self.assertIn("Mention me (<@42>)", text)
+        self.assertIs(bot.build_help_text("Banana", "<@42>"), text)
+
+
+class TestTierChoices(unittest.TestCase):
+    def test_tier_choice_labels(self):
+        names = {choice.value: choice.name for choice in bot.TIER_CHOICES}
+        self.assertEqual(names["standard"], "Standard (3 charges)")
+        self.assertEqual(names["strict"], "Strict (1 charge)")
+        self.assertEqual(names["unlimited"], "Unlimited")
+        self.assertEqual(list(names), list(bot.TIER_LIMITS))
+
+
+class TestAvatarTemplates(unittest.TestCase):
+    def test_choices_and_lookup_cover_every_template(self):
+        values = [choice.value for choice in bot.AVATAR_TEMPLATE_CHOICES]
+        self.assertEqual(values, ['halloween', 'christmas', 'newyear'])
+        self.assertEqual(set(bot.AVATAR_TEMPLATE_LOOKUP), set(values))
+        self.assertEqual(bot.AVATAR_TEMPLATE_LOOKUP['christmas'], ("Christmasify this image", '🎄'))
+
+
+class TestAvatarResultCache(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(bot, "_avatar_result_cache", OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_result_cached_per_avatar_and_template(self):
+        bot.cache_avatar_result("https://cdn/avatars/1/abc.png", "christmas", b"png", "Merry")
+
+        self.assertEqual(bot.get_cached_avatar_result("https://cdn/avatars/1/abc.png", "christmas"), (b"png", "Merry"))
+        self.assertIsNone(bot.get_cached_avatar_result("https://cdn/avatars/1/abc.png", "halloween"))
+        self.assertIsNone(bot.get_cached_avatar_result("https://cdn/avatars/1/def.png", "christmas"))
+
+    def test_least_recently_used_result_evicted(self):
+        with patch.object(bot.config, "AVATAR_CACHE_SIZE", 2):
+            bot.cache_avatar_result("a", "christmas", b"1", None)
+            bot.cache_avatar_result("b", "christmas", b"2", None)
+            bot.get_cached_avatar_result("a", "christmas")
+            bot.cache_avatar_result("c", "christmas", b"3", None)
+
+        self.assertIsNotNone(bot.get_cached_avatar_result("a", "christmas"))
+        self.assertIsNone(bot.get_cached_avatar_result("b", "christmas"))
+
+    def test_build_avatar_message_appends_model_text(self):
+        self.assertEqual(bot.build_avatar_message("🎄", "Christmas", None), "🎄 **Christmas Avatar Transformation**")
+        self.assertEqual(
+            bot.build_avatar_message("🎄", "Christmas", "Ho ho"),
+            "🎄 **Christmas Avatar Transformation**\n\nHo ho",
+        )
+
+
+class TestBuildImageResultEmbeds(unittest.TestCase):
+    def test_result_embed_fields_and_input_embeds(self):
+        from PIL import Image as PILImage
+
+        attachment = MagicMock()
+        attachment.url = "https://cdn.example.com/input.png"
+        embeds = bot.build_image_result_embeds(
+            "nanobanana", "a cat", "Here is a cat", PILImage.new("RGB", (4, 2)),
+            "16:9", "nanobanana_1.png", [attachment], 1.5,
+        )
+
+        self.assertEqual(len(embeds), 2)
+        self.assertEqual(embeds[0].image.url, attachment.url)
+        result = embeds[1]
+        self.assertEqual(result.description, "Here is a cat")
+        fields = {field.name: field.value for field in result.fields}
+        self.assertEqual(fields["Prompt"], "a cat")
+        self.assertEqual(fields["Resolution"], "4×2 (8 pixels)")
+        self.assertEqual(fields["Aspect Ratio"], "16:9")
+        self.assertEqual(fields["Model"], "Gemini")
+        self.assertEqual(result.image.url, "attachment://nanobanana_1.png")
+
+    def test_prompt_echo_and_text_only(self):
+        embeds = bot.build_image_result_embeds("gptimage", "a dog", "a dog", None, None, None, [], 0.1)
+
+        self.assertEqual(len(embeds), 1)
+        result = embeds[0]
+        self.assertIsNone(result.description)
+        self.assertIsNone(result.image.url)
+        self.assertEqual([field.name for field in result.fields], ["Prompt", "Model"])
+        self.assertEqual(result.fields[1].value, "GPT Image 2")
+
+
+class TestCleanupOldTrackedMessages(unittest.TestCase):
+    def test_removes_only_expired_leading_entries(self):
+        from datetime import datetime, timedelta
+
+        now = datetime.now()
+        tracked = {
+            1: {'timestamp': now - timedelta(hours=10)},
+            2: {'timestamp': now - timedelta(hours=9)},
+            3: {'timestamp': now - timedelta(hours=1)},
+        }
+        with patch.dict(bot.tracked_messages, tracked, clear=True):
+            bot.cleanup_old_tracked_messages()
+            self.assertEqual(list(bot.tracked_messages), [3])
+
+
+    def test_trims_oldest_entries_beyond_cap(self):
+        from datetime import datetime
+
+        now = datetime.now()
+        tracked = {message_id: {'timestamp': now} for message_id in range(5)}
+        with patch.dict(bot.tracked_messages, tracked, clear=True), \
+             patch.object(bot, "MAX_TRACKED_MESSAGES", 3):
+            bot.cleanup_old_tracked_messages()
+            self.assertEqual(list(bot.tracked_messages), [3, 4])
+
+
+class TestWordplaySubmitButton(unittest.IsolatedAsyncioTestCase):
+    async def test_from_custom_id_restores_message_id(self):
+        view = bot.WordplayAnswerView(1234)
+        button = view.children[0]
+        match = button.__discord_ui_compiled_template__.fullmatch(button.custom_id)
+
+        restored = await bot.WordplaySubmitButton.from_custom_id(MagicMock(), button.item, match)
+
+        self.assertEqual(restored.message_id, 1234)
+        self.assertEqual(restored.custom_id, "wordplay_submit_1234")
+
+
+class TestBuildWordplayPuzzleEmbed(unittest.TestCase):
+    def test_singular_and_plural_wording(self):
+        single = bot.build_wordplay_puzzle_embed(1, 0.5)
+        double = bot.build_wordplay_puzzle_embed(2, 0.5)
+
+        self.assertIn("1 additional letter!", single.description)
+        self.assertIn("Find the extra letter that turns", single.description)
+        self.assertIn("2 additional letters!", double.description)
+        self.assertIn("Find the extra letters that turn the", double.description)
+        self.assertEqual([field.name for field in single.fields], ["📸 Image 1", "📸 Image 2", "How to answer:"])
+        self.assertIn("Thought for 500ms", single.footer.text)
+
+
+class TestWordplaySlash(unittest.IsolatedAsyncioTestCase):
+    async def test_status_message_becomes_the_puzzle(self):
+        """The status message is edited into the puzzle instead of being replaced by a new message."""
+        from PIL import Image as PILImage
+
+        interaction = MagicMock()
+        interaction.user.id = 321
+        interaction.response.defer = AsyncMock()
+        status_msg = MagicMock(id=555)
+        status_msg.edit = AsyncMock()
+        status_msg.delete = AsyncMock()
+        interaction.followup.send = AsyncMock(return_value=status_msg)
+        mock_tracker = MagicMock()
+        mock_tracker.reserve_usage_slots.return_value = (True, None)
+        mock_sessions = MagicMock()
+
+        with patch("bot.is_dm_channel", return_value=False), \
+             patch("bot.usage_tracker", mock_tracker), \
+             patch("bot.get_model_generator", return_value=MagicMock()), \
+             patch("bot.generate_word_pair_with_gemini", AsyncMock(return_value=("PLANT", "PLANET", "E"))), \
+             patch("bot.generate_word_image", AsyncMock(return_value=PILImage.new("RGB", (2, 2)))), \
+             patch("bot.session_manager", mock_sessions), \
+             patch("bot.queue_image_archive"):
+            await bot.wordplay_slash.callback(interaction)
+
+        interaction.followup.send.assert_awaited_once()
+        status_msg.delete.assert_not_called()
+        self.assertEqual(mock_sessions.create_session.call_args.args[:5], (555, 321, "PLANT", "PLANET", "E"))
+        edit_kwargs = status_msg.edit.call_args.kwargs
+        self.assertIsNone(edit_kwargs["content"])
+        self.assertEqual(len(edit_kwargs["attachments"]), 2)
+        self.assertEqual(edit_kwargs["view"].children[0].custom_id, "wordplay_submit_555")
+
+
+class TestResetSlash(unittest.IsolatedAsyncioTestCase):
+    async def test_defers_before_usage_file_access(self):
+        interaction = _make_interaction()
+        calls = []
+        interaction.response.defer = AsyncMock(side_effect=lambda **kwargs: calls.append("defer"))
+        mock_tracker = MagicMock()
+        mock_tracker.reset_daily_usage.side_effect = lambda user_id: calls.append("reset") or True
+        mock_tracker.get_daily_image_count.return_value = 0
+        user = MagicMock(id=7)
+
+        with patch("bot.is_dm_channel", return_value=False), \
+             patch("bot.usage_tracker", mock_tracker):
+            await bot.reset_slash.callback(interaction, user)
+
+        self.assertEqual(calls, ["defer", "reset"])
+        interaction.response.defer.assert_awaited_once_with(ephemeral=True)
+        interaction.response.send_message.assert_not_called()
+        interaction.followup.send.assert_awaited_once()
+
+
+    async def test_status_message_deleted_when_image_generation_raises(self):
+        interaction = MagicMock()
+        interaction.user.id = 321
+        interaction.response.defer = AsyncMock()
+        status_msg = MagicMock(id=555)
+        status_msg.delete = AsyncMock()
+        interaction.followup.send = AsyncMock(return_value=status_msg)
+        mock_tracker = MagicMock()
+        mock_tracker.reserve_usage_slots.return_value = (True, None)
+
+        with patch("bot.is_dm_channel", return_value=False), \
+             patch("bot.usage_tracker", mock_tracker), \
+             patch("bot.get_model_generator", return_value=MagicMock()), \
+             patch("bot.generate_word_pair_with_gemini", AsyncMock(return_value=("PLANT", "PLANET", "E"))), \
+             patch("bot.generate_word_image", AsyncMock(side_effect=RuntimeError("model down"))):
+            await bot.wordplay_slash.callback(interaction)
+
+        status_msg.delete.assert_awaited_once()
+
+
 class TestBotHelpers(unittest.IsolatedAsyncioTestCase):
     async def test_generate_image_for_model_text_only(self):
         mock_generator = SimpleNamespace(
@@ -89,6 +435,20 @@ class TestBotHelpers(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(usage, {"total_token_count": 1})
         mock_generator.generate_image_from_text.assert_awaited_once_with("prompt", None, None)
 
+    async def test_generate_image_for_model_passes_extra_images(self):
+        mock_generator = SimpleNamespace(
+            generate_image_from_text=AsyncMock(),
+            generate_image_from_text_and_image=AsyncMock(return_value=("img", None, None)),
+            generate_image_from_image_only=AsyncMock(return_value=("img", None, None)),
+        )
+
+        with patch("bot.get_model_generator", return_value=mock_generator):
+            await bot.generate_image_for_model("gpt", "combine", ["a", "b"], "1:1")
+            await bot.generate_image_for_model("gpt", "", ["a"], None)
+
+        mock_generator.generate_image_from_text_and_image.assert_awaited_once_with("combine", "a", None, "1:1", ["b"])
+        mock_generator.generate_image_from_image_only.assert_awaited_once_with("a", None, None, None)
+
     async def test_generate_image_for_model_without_prompt_or_images(self):
         mock_generator = SimpleNamespace(
             generate_image_from_text=AsyncMock(),
@@ -236,12 +596,38 @@ class TestDiscordToolHelpers(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(members, [cached_member])
 
 
-def _make_attachment(filename="img.png", content_type="image/png", url="http://example.com/img.png"):
+class TestBuildImageFilename(unittest.TestCase):
+    def test_filenames_are_unique_within_the_same_second(self):
+        first = bot.build_image_filename("chat")
+        second = bot.build_image_filename("chat")
+
+        self.assertRegex(first, r"^chat_\d+_\d+\.png$")
+        self.assertNotEqual(first, second)
+
+
+class TestArchiveWorker(unittest.IsolatedAsyncioTestCase):
+    async def test_queued_images_are_saved_to_generated_images_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(bot, "GENERATED_IMAGES_PATH", Path(temp_dir)), \
+             patch.object(bot, "_archive_queue", asyncio.Queue()):
+            bot.queue_image_archive(b"png-bytes", "archived.png")
+            worker = asyncio.create_task(bot.archive_worker())
+            try:
+                await asyncio.wait_for(bot._archive_queue.join(), timeout=5)
+            finally:
+                worker.cancel()
+
+            with open(os.path.join(temp_dir, "archived.png"), "rb") as archived:
+                self.assertEqual(archived.read(), b"png-bytes")
+
+
+def _make_attachment(filename="img.png", content_type="image/png", url="http://example.com/img.png", size=1024):
     """Create a minimal mock Discord attachment."""
     a = MagicMock()
     a.filename = filename
     a.content_type = content_type
     a.url = url
+    a.size = size
     return a
 
 
@@ -273,6 +659,47 @@ def _make_embed(description=None, fields=None, image_url=None, thumbnail_url=Non
     return embed
 
 
+class TestZPTBotClose(unittest.IsolatedAsyncioTestCase):
+    async def test_close_flushes_pending_writes_and_releases_http_session(self):
+        client = bot.ZPTBot(command_prefix="!", intents=discord.Intents.none(), help_command=None)
+
+        with patch("bot.flush_usage_records", AsyncMock()) as mock_flush, \
+             patch.object(bot.session_manager, "flush_sessions", AsyncMock()) as mock_flush_sessions, \
+             patch("bot.close_http_session", AsyncMock()) as mock_close_session:
+            await client.close()
+
+        mock_flush.assert_awaited_once()
+        mock_flush_sessions.assert_awaited_once()
+        mock_close_session.assert_awaited_once()
+
+
+class TestUsageWorker(unittest.IsolatedAsyncioTestCase):
+    async def test_queued_records_are_written_as_one_batch(self):
+        with patch.object(bot, "usage_tracker") as mock_tracker, \
+             patch.object(bot, "_usage_queue", asyncio.Queue()):
+            bot.queue_usage_record(user_id=1, images_generated=1)
+            bot.queue_usage_record(user_id=2, images_generated=0)
+            worker = asyncio.create_task(bot.usage_worker())
+            try:
+                await asyncio.wait_for(bot._usage_queue.join(), timeout=5)
+            finally:
+                worker.cancel()
+
+        mock_tracker.record_usage_batch.assert_called_once_with(
+            [{"user_id": 1, "images_generated": 1}, {"user_id": 2, "images_generated": 0}]
+        )
+
+    async def test_flush_writes_backlog_when_worker_not_running(self):
+        with patch.object(bot, "usage_tracker") as mock_tracker, \
+             patch.object(bot, "_usage_queue", asyncio.Queue()), \
+             patch.object(bot, "_usage_worker_task", None):
+            bot.queue_usage_record(user_id=1, images_generated=1)
+            await bot.flush_usage_records()
+            self.assertTrue(bot._usage_queue.empty())
+
+        mock_tracker.record_usage_batch.assert_called_once_with([{"user_id": 1, "images_generated": 1}])
+
+
 class TestCollectMessageImages(unittest.IsolatedAsyncioTestCase):
     async def test_no_attachments(self):
         msg = _make_message(attachments=[])
@@ -284,7 +711,7 @@ class TestCollectMessageImages(unittest.IsolatedAsyncioTestCase):
         msg = _make_message(attachments=[attachment])
 
         fake_img = object()
-        with patch("bot.download_image", AsyncMock(return_value=fake_img)):
+        with patch("bot.download_attachment_image", AsyncMock(return_value=fake_img)):
             images = await bot.collect_message_images(msg)
 
         self.assertEqual(images, [fake_img])
@@ -293,17 +720,37 @@ class TestCollectMessageImages(unittest.IsolatedAsyncioTestCase):
         attachment = _make_attachment(filename="doc.pdf", content_type="application/pdf")
         msg = _make_message(attachments=[attachment])
 
-        with patch("bot.download_image", AsyncMock()) as mock_dl:
+        with patch("bot.download_attachment_image", AsyncMock()) as mock_dl:
+            images = await bot.collect_message_images(msg)
+
+        self.assertEqual(images, [])
+        mock_dl.assert_not_called()
+
+    async def test_oversized_attachment_skipped_without_download(self):
+        attachment = _make_attachment(size=bot.config.MAX_IMAGE_SIZE + 1)
+        msg = _make_message(attachments=[attachment])
+
+        with patch("bot.download_attachment_image", AsyncMock()) as mock_dl:
             images = await bot.collect_message_images(msg)
 
         self.assertEqual(images, [])
         mock_dl.assert_not_called()
 
+    async def test_image_without_content_type_detected_by_extension(self):
+        attachment = _make_attachment(filename="Photo.JPG", content_type=None)
+        msg = _make_message(attachments=[attachment])
+
+        fake_img = object()
+        with patch("bot.download_attachment_image", AsyncMock(return_value=fake_img)):
+            images = await bot.collect_message_images(msg)
+
+        self.assertEqual(images, [fake_img])
+
     async def test_failed_download_skipped(self):
         attachment = _make_attachment()
         msg = _make_message(attachments=[attachment])
 
-        with patch("bot.download_image", AsyncMock(return_value=None)):
+        with patch("bot.download_attachment_image", AsyncMock(return_value=None)):
             images = await bot.collect_message_images(msg)
 
         self.assertEqual(images, [])
@@ -338,15 +785,170 @@ class TestCollectMessageImages(unittest.IsolatedAsyncioTestCase):
         msg = _make_message(attachments=[attachment], embeds=[embed])
 
         fake_img = object()
-        mock_dl = AsyncMock(return_value=fake_img)
-        with patch("bot.download_image", mock_dl):
+        mock_read = AsyncMock(return_value=fake_img)
+        mock_dl = AsyncMock()
+        with patch("bot.download_attachment_image", mock_read), \
+             patch("bot.download_image", mock_dl):
             images = await bot.collect_message_images(msg)
 
-        mock_dl.assert_called_once_with(shared_url)
+        mock_read.assert_called_once_with(attachment)
+        mock_dl.assert_not_called()
         self.assertEqual(images, [fake_img])
 
 
+    async def test_shared_seen_urls_skip_images_from_earlier_message(self):
+        """URLs already collected from another message are not downloaded again."""
+        shared_url = "http://example.com/shared.png"
+        first = _make_message(attachments=[_make_attachment(url=shared_url)])
+        second = _make_message(attachments=[_make_attachment(url=shared_url)])
+
+        seen_urls = set()
+        mock_read = AsyncMock(return_value=object())
+        with patch("bot.download_attachment_image", mock_read):
+            await bot.collect_message_images(first, seen_urls)
+            images = await bot.collect_message_images(second, seen_urls)
+
+        mock_read.assert_called_once()
+        self.assertEqual(images, [])
+
+    async def test_downloads_run_concurrently_and_keep_order(self):
+        """All image downloads are started before any finishes, and results keep message order."""
+        attachment = _make_attachment(url="http://example.com/a.png")
+        embed = _make_embed(image_url="http://example.com/b.png")
+        msg = _make_message(attachments=[attachment], embeds=[embed])
+
+        started = []
+        both_started = asyncio.Event()
+
+        async def fake_download(url):
+            started.append(url)
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return url
+
+        async def fake_read(attachment):
+            return await fake_download(attachment.url)
+
+        with patch("bot.download_attachment_image", side_effect=fake_read), \
+             patch("bot.download_image", side_effect=fake_download):
+            images = await bot.collect_message_images(msg)
+
+        self.assertEqual(images, ["http://example.com/a.png", "http://example.com/b.png"])
+
+class TestDownloadCommandImages(unittest.IsolatedAsyncioTestCase):
+    async def test_downloads_valid_attachments_in_order(self):
+        first = _make_attachment(url="http://example.com/1.png")
+        second = _make_attachment(url="http://example.com/2.png")
+        first.size = second.size = 1024
+        interaction = MagicMock()
+
+        with patch("bot.download_attachment_image", AsyncMock(side_effect=["img1", "img2"])) as mock_dl:
+            images = await bot.download_command_images([first, None, second], interaction)
+
+        self.assertEqual(images, ["img1", "img2"])
+        self.assertEqual(mock_dl.await_count, 2)
+
+    async def test_oversized_attachment_rejected_before_any_download(self):
+        small = _make_attachment(url="http://example.com/small.png")
+        small.size = 1024
+        large = _make_attachment(filename="large.png", url="http://example.com/large.png")
+        large.size = bot.config.MAX_IMAGE_SIZE + 1
+        interaction = MagicMock()
+        interaction.followup.send = AsyncMock()
+
+        with patch("bot.download_attachment_image", AsyncMock()) as mock_dl:
+            images = await bot.download_command_images([small, large], interaction)
+
+        self.assertIsNone(images)
+        mock_dl.assert_not_called()
+        interaction.followup.send.assert_awaited_once()
+
+
+class TestResolveReferencedMessage(unittest.IsolatedAsyncioTestCase):
+    async def test_no_reference(self):
+        msg = _make_message(reference=None)
+        self.assertIsNone(await bot.resolve_referenced_message(msg))
+
+    async def test_cached_message_used_without_fetch(self):
+        ref_msg = _make_message(content="earlier")
+        reference = MagicMock(message_id=99, cached_message=ref_msg)
+        msg = _make_message(reference=reference)
+
+        self.assertIs(await bot.resolve_referenced_message(msg), ref_msg)
+        msg.channel.fetch_message.assert_not_called()
+
+    async def test_resolved_message_used_without_fetch(self):
+        ref_msg = MagicMock(spec=discord.Message)
+        reference = MagicMock(message_id=99, cached_message=None, resolved=ref_msg)
+        msg = _make_message(reference=reference)
+
+        self.assertIs(await bot.resolve_referenced_message(msg), ref_msg)
+        msg.channel.fetch_message.assert_not_called()
+
+    async def test_deleted_reference_returns_none_without_fetch(self):
+        deleted = MagicMock(spec=discord.DeletedReferencedMessage)
+        reference = MagicMock(message_id=99, cached_message=None, resolved=deleted)
+        msg = _make_message(reference=reference)
+
+        self.assertIsNone(await bot.resolve_referenced_message(msg))
+        msg.channel.fetch_message.assert_not_called()
+
+    async def test_fetch_failure_returns_none(self):
+        reference = MagicMock(message_id=99, cached_message=None)
+        msg = _make_message(reference=reference)
+        msg.channel.fetch_message = AsyncMock(side_effect=discord.NotFound(MagicMock(status=404), "gone"))
+
+        self.assertIsNone(await bot.resolve_referenced_message(msg))
+
+
+class TestOnMessage(unittest.IsolatedAsyncioTestCase):
+    def _message(self, content, reference=None):
+        msg = _make_message(content=content, reference=reference)
+        msg.author.bot = False
+        msg.mentions = [MagicMock(id=42)] if "<@42>" in content else []
+        return msg
+
+    async def test_unrelated_message_skips_tracker_and_handlers(self):
+        msg = self._message("just chatting")
+
+        with patch.object(bot, "bot", MagicMock(user=MagicMock(id=42))) as mock_bot, \
+             patch("bot.usage_tracker") as mock_tracker, \
+             patch("bot.handle_conversation_request", AsyncMock()) as mock_handle:
+            await bot.on_message(msg)
+
+        self.assertEqual(mock_tracker.mock_calls, [])
+        mock_bot.process_commands.assert_not_called()
+        mock_handle.assert_not_awaited()
+
+    async def test_mention_starts_conversation_without_command_processing(self):
+        msg = self._message("<@42> hello")
+        msg.channel = MagicMock(spec=discord.TextChannel)
+
+        with patch.object(bot, "bot", MagicMock(user=MagicMock(id=42))) as mock_bot, \
+             patch.dict(bot.tracked_messages, clear=True), \
+             patch("bot.usage_tracker"), \
+             patch("bot.handle_conversation_request", AsyncMock()) as mock_handle:
+            await bot.on_message(msg)
+
+        mock_bot.process_commands.assert_not_called()
+        mock_handle.assert_awaited_once_with(msg, None)
+
+
 class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
+    async def test_error_shown_in_thinking_reply(self):
+        """An error while gathering context edits the placeholder instead of posting a second reply."""
+        user_msg = _make_message(content="hi")
+        response_msg = AsyncMock()
+        user_msg.reply = AsyncMock(return_value=response_msg)
+
+        with patch("bot.extract_text_from_message", MagicMock(return_value="hi")), \
+             patch("bot.collect_message_images", AsyncMock(side_effect=RuntimeError("boom"))):
+            await bot.handle_conversation_request(user_msg)
+
+        user_msg.reply.assert_awaited_once_with("Thinking...")
+        response_msg.edit.assert_awaited_once_with(content=bot.CONVERSATION_ERROR_MESSAGE, attachments=[])
+
     async def test_includes_replied_message_text(self):
         """Context from the replied-to message is prepended to the user's message."""
         ref_author = MagicMock()
@@ -367,7 +969,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "Summary here", {}))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="summarise this")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="summarise this")), \
              patch("bot.download_image", AsyncMock(return_value=None)):
             await bot.handle_conversation_request(user_msg)
 
@@ -391,8 +993,8 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "Description", {}))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="describe this")), \
-             patch("bot.download_image", AsyncMock(return_value=fake_img)):
+             patch("bot.extract_text_from_message", MagicMock(return_value="describe this")), \
+             patch("bot.download_attachment_image", AsyncMock(return_value=fake_img)):
             await bot.handle_conversation_request(user_msg)
 
         call_args = mock_generator.generate_text_only_response.call_args
@@ -412,7 +1014,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "That is Alice.", {}))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="who is <@123>?")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="who is <@123>?")), \
              patch("bot.download_image", AsyncMock(return_value=None)):
             await bot.handle_conversation_request(user_msg)
 
@@ -442,8 +1044,8 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "It is a cat", {}))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="what is this image?")), \
-             patch("bot.download_image", AsyncMock(return_value=fake_img)):
+             patch("bot.extract_text_from_message", MagicMock(return_value="what is this image?")), \
+             patch("bot.download_attachment_image", AsyncMock(return_value=fake_img)):
             await bot.handle_conversation_request(user_msg)
 
         call_args = mock_generator.generate_text_only_response.call_args
@@ -463,7 +1065,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock()
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="")):
+             patch("bot.extract_text_from_message", MagicMock(return_value="")):
             await bot.handle_conversation_request(user_msg)
 
         response_msg.edit.assert_awaited_once()
@@ -495,7 +1097,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "Continuation...", {}))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="continue this")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="continue this")), \
              patch("bot.download_image", AsyncMock(return_value=None)):
             await bot.handle_conversation_request(user_msg)
 
@@ -528,7 +1130,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "Once upon a time...", {}))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="write a story for this image")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="write a story for this image")), \
              patch("bot.download_image", AsyncMock(return_value=fake_img)):
             await bot.handle_conversation_request(user_msg)
 
@@ -556,7 +1158,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "I can still help with text.", {}))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="draw a dragon")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="draw a dragon")), \
              patch("bot.download_image", AsyncMock(return_value=None)), \
              patch("bot.usage_tracker") as mock_tracker:
             mock_tracker.is_elevated_user.return_value = False
@@ -600,16 +1202,17 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(fake_img, "Done!", usage_meta))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="draw a fox")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="draw a fox")), \
              patch("bot.download_image", AsyncMock(return_value=None)), \
-             patch("bot.usage_tracker") as mock_tracker:
+             patch("bot.usage_tracker") as mock_tracker, \
+             patch("bot.queue_usage_record") as mock_record:
             mock_tracker.is_elevated_user.return_value = False
             mock_tracker.reserve_usage_slots.return_value = (True, None)
 
             await bot.handle_conversation_request(user_msg)
 
-        mock_tracker.record_usage.assert_called_once()
-        record_kwargs = mock_tracker.record_usage.call_args.kwargs
+        mock_record.assert_called_once()
+        record_kwargs = mock_record.call_args.kwargs
         self.assertEqual(record_kwargs["consume_reserved_slots"], 1)
         mock_tracker.release_reserved_usage_slots.assert_not_called()
 
@@ -632,7 +1235,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "Hi!", None))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="hello there")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="hello there")), \
              patch("bot.download_image", AsyncMock(return_value=None)), \
              patch("bot.usage_tracker") as mock_tracker:
             mock_tracker.is_elevated_user.return_value = False
@@ -671,13 +1274,14 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(fake_img, "Here you go!", usage_meta))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="draw a cat")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="draw a cat")), \
              patch("bot.download_image", AsyncMock(return_value=None)), \
-             patch("bot.usage_tracker") as mock_tracker:
+             patch("bot.usage_tracker"), \
+             patch("bot.queue_usage_record") as mock_record:
             await bot.handle_conversation_request(user_msg)
 
-        mock_tracker.record_usage.assert_called_once()
-        call_kwargs = mock_tracker.record_usage.call_args.kwargs
+        mock_record.assert_called_once()
+        call_kwargs = mock_record.call_args.kwargs
         self.assertEqual(call_kwargs["user_id"], 123)
         self.assertEqual(call_kwargs["images_generated"], 1)
         self.assertEqual(call_kwargs["prompt_tokens"], 5)
@@ -707,13 +1311,14 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "Hello there!", usage_meta))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="hello")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="hello")), \
              patch("bot.download_image", AsyncMock(return_value=None)), \
-             patch("bot.usage_tracker") as mock_tracker:
+             patch("bot.usage_tracker"), \
+             patch("bot.queue_usage_record") as mock_record:
             await bot.handle_conversation_request(user_msg)
 
-        mock_tracker.record_usage.assert_called_once()
-        call_kwargs = mock_tracker.record_usage.call_args.kwargs
+        mock_record.assert_called_once()
+        call_kwargs = mock_record.call_args.kwargs
         self.assertEqual(call_kwargs["images_generated"], 0)
 
     async def test_model_footer_appended_for_gpt_image(self):
@@ -744,7 +1349,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(fake_img, "Here is your dog!", usage_meta))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="make a dog")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="make a dog")), \
              patch("bot.download_image", AsyncMock(return_value=None)), \
              patch("bot.usage_tracker"):
             await bot.handle_conversation_request(user_msg)
@@ -783,7 +1388,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(fake_img, "Sky painted!", usage_meta))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="paint a sky")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="paint a sky")), \
              patch("bot.download_image", AsyncMock(return_value=None)), \
              patch("bot.usage_tracker"):
             await bot.handle_conversation_request(user_msg)
@@ -819,7 +1424,7 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         mock_generator.generate_text_only_response = AsyncMock(return_value=(fake_img, "Here!", usage_meta))
 
         with patch("bot.get_model_generator", return_value=mock_generator), \
-             patch("bot.extract_text_from_message", AsyncMock(return_value="show me something")), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="show me something")), \
              patch("bot.download_image", AsyncMock(return_value=None)), \
              patch("bot.usage_tracker"):
             await bot.handle_conversation_request(user_msg)
@@ -828,5 +1433,54 @@ class TestHandleConversationRequest(unittest.IsolatedAsyncioTestCase):
         self.assertNotIn("-# *Used", content_sent)
 
 
+    async def test_shows_queued_notice_while_chat_slots_are_full(self):
+        """When every chat slot is taken, the placeholder reply says the request is queued."""
+        user_msg = _make_message(content="hi", attachments=[])
+        user_msg.reference = None
+        response_msg = AsyncMock()
+        user_msg.reply = AsyncMock(return_value=response_msg)
+
+        mock_generator = MagicMock()
+        mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "Hello!", {}))
+        semaphore = asyncio.Semaphore(1)
+        await semaphore.acquire()
+
+        with patch("bot.get_model_generator", return_value=mock_generator), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="hi")), \
+             patch("bot._chat_semaphore", semaphore), \
+             patch("bot.usage_tracker"):
+            task = asyncio.create_task(bot.handle_conversation_request(user_msg))
+            for _ in range(20):
+                if response_msg.edit.await_count:
+                    break
+                await asyncio.sleep(0)
+            mock_generator.generate_text_only_response.assert_not_called()
+            semaphore.release()
+            await task
+
+        edits = [call.kwargs.get("content") for call in response_msg.edit.call_args_list]
+        self.assertEqual(edits, [bot.GENERATION_QUEUED_MESSAGE, "Hello!"])
+
+    async def test_chat_not_queued_behind_image_generation(self):
+        """Busy image generation slots don't hold up a chat reply."""
+        user_msg = _make_message(content="hi", attachments=[])
+        user_msg.reference = None
+        response_msg = AsyncMock()
+        user_msg.reply = AsyncMock(return_value=response_msg)
+
+        mock_generator = MagicMock()
+        mock_generator.generate_text_only_response = AsyncMock(return_value=(None, "Hello!", {}))
+        image_semaphore = asyncio.Semaphore(1)
+        await image_semaphore.acquire()
+
+        with patch("bot.get_model_generator", return_value=mock_generator), \
+             patch("bot.extract_text_from_message", MagicMock(return_value="hi")), \
+             patch("bot._generation_semaphore", image_semaphore), \
+             patch("bot.usage_tracker"):
+            await asyncio.wait_for(bot.handle_conversation_request(user_msg), timeout=5)
+
+        edits = [call.kwargs.get("content") for call in response_msg.edit.call_args_list]
+        self.assertEqual(edits, ["Hello!"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,153 @@
+import io
+import unittest
+from collections import OrderedDict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from PIL import Image
+
+import image_utils
+
+
+def _png_bytes(size=(3, 2)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _make_attachment(url, data=None, error=None):
+    read = AsyncMock(return_value=data, side_effect=error)
+    return MagicMock(url=url, filename="img.png", read=read)
+
+
+class TestDownloadAttachmentImage(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        cache_patch = patch.object(image_utils, "_image_cache", OrderedDict())
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+    async def test_reads_attachment_bytes_into_image(self):
+        attachment = _make_attachment("https://cdn.discordapp.com/a.png", _png_bytes())
+
+        image = await image_utils.download_attachment_image(attachment)
+
+        self.assertEqual(image.size, (3, 2))
+        attachment.read.assert_awaited_once()
+
+    async def test_returns_none_when_read_fails(self):
+        attachment = _make_attachment("https://cdn.discordapp.com/a.png", error=OSError("gone"))
+
+        self.assertIsNone(await image_utils.download_attachment_image(attachment))
+        self.assertEqual(len(image_utils._image_cache), 0)
+
+    async def test_repeat_download_served_from_cache_despite_new_signature(self):
+        first = _make_attachment("https://cdn.discordapp.com/a.png?ex=1&is=2&hm=3", _png_bytes())
+        second = _make_attachment("https://cdn.discordapp.com/a.png?ex=4&is=5&hm=6", _png_bytes())
+
+        image = await image_utils.download_attachment_image(first)
+        repeat = await image_utils.download_attachment_image(second)
+
+        self.assertEqual(repeat.tobytes(), image.tobytes())
+        second.read.assert_not_awaited()
+
+    async def test_callers_get_copies_of_cached_image(self):
+        url = "https://cdn.discordapp.com/a.png"
+        image = await image_utils.download_attachment_image(_make_attachment(url, _png_bytes()))
+        image.putpixel((0, 0), (0, 0, 255))
+
+        repeat = await image_utils.download_attachment_image(_make_attachment(url, _png_bytes()))
+
+        self.assertIsNot(repeat, image)
+        self.assertIsNot(image_utils._image_cache[url], image)
+        self.assertNotEqual(repeat.getpixel((0, 0)), (0, 0, 255))
+
+    def test_signature_params_only_ignored_for_discord_cdn_hosts(self):
+        self.assertEqual(
+            image_utils._image_cache_key("https://media.discordapp.net/a.png?ex=1&is=2&hm=3&width=64"),
+            "https://media.discordapp.net/a.png?width=64",
+        )
+        self.assertEqual(
+            image_utils._image_cache_key("https://example.com/a.png?ex=1&hm=3"),
+            "https://example.com/a.png?ex=1&hm=3",
+        )
+
+    async def test_least_recently_used_image_evicted(self):
+        with patch.object(image_utils.config, "IMAGE_CACHE_SIZE", 2):
+            for name in ("a", "b", "c"):
+                await image_utils.download_attachment_image(
+                    _make_attachment(f"https://cdn.discordapp.com/{name}.png", _png_bytes())
+                )
+
+        self.assertEqual(
+            list(image_utils._image_cache),
+            ["https://cdn.discordapp.com/b.png", "https://cdn.discordapp.com/c.png"],
+        )
+
+
+class TestHttpSession(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        await image_utils.close_http_session()
+
+    async def test_session_reused_until_closed(self):
+        session = await image_utils.get_http_session()
+        self.assertIs(await image_utils.get_http_session(), session)
+
+        await image_utils.close_http_session()
+        self.assertTrue(session.closed)
+        self.assertIsNot(await image_utils.get_http_session(), session)
+
+    async def test_session_from_another_loop_closed_before_replacement(self):
+        stale = MagicMock(closed=False, close=AsyncMock())
+        with patch.object(image_utils, "_http_session", stale), \
+             patch.object(image_utils, "_http_session_loop", object()):
+            session = await image_utils.get_http_session()
+
+        stale.close.assert_awaited_once()
+        self.assertIsNot(session, stale)
+        await session.close()
+
+
+class TestEncodePng(unittest.IsolatedAsyncioTestCase):
+    async def test_encode_png_round_trips(self):
+        image = Image.new("RGB", (4, 3), color="red")
+
+        data = await image_utils.encode_png(image)
+
+        self.assertTrue(data.startswith(b"\x89PNG"))
+        decoded = Image.open(io.BytesIO(data))
+        self.assertEqual(decoded.size, (4, 3))
+        self.assertEqual(decoded.getpixel((0, 0)), (255, 0, 0))
+
+    async def test_encode_png_uses_fast_compression_by_default(self):
+        image = Image.new("RGB", (2, 2))
+
+        with patch.object(Image.Image, "save", autospec=True) as mock_save:
+            await image_utils.encode_png(image)
+
+        self.assertEqual(mock_save.call_args.kwargs["compress_level"], image_utils.DISCORD_PNG_COMPRESS_LEVEL)
+
+
+
+class TestEncodePngForApi(unittest.IsolatedAsyncioTestCase):
+    async def test_same_image_is_encoded_once(self):
+        image = Image.new("RGB", (2, 2))
+
+        with patch.object(image_utils, "_encode_png", wraps=image_utils._encode_png) as mock_encode:
+            first = await image_utils.encode_png_for_api(image)
+            second = await image_utils.encode_png_for_api(image)
+
+        self.assertIs(first, second)
+        mock_encode.assert_called_once_with(image, image_utils.API_PNG_COMPRESS_LEVEL)
+
+    async def test_cache_entry_dropped_with_image(self):
+        image = Image.new("RGB", (2, 2))
+        key = id(image)
+        await image_utils.encode_png_for_api(image)
+        self.assertIn(key, image_utils._api_png_cache)
+
+        del image
+
+        self.assertNotIn(key, image_utils._api_png_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
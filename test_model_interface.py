@@ -17,6 +17,20 @@ def _png_b64() -> str:
     return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
 
+class TestGetModelGenerator(unittest.TestCase):
+    def test_generator_instances_are_reused(self):
+        with patch.object(model_interface.config, "OPENAI_API_KEY", "test-key"), patch.object(
+            model_interface, "OpenAI", return_value=Mock()
+        ) as mock_openai, patch.dict(model_interface._generator_instances, clear=True):
+            first = model_interface.get_model_generator("chat")
+            second = model_interface.get_model_generator("chat")
+            gpt = model_interface.get_model_generator("gpt")
+
+        self.assertIs(first, second)
+        self.assertIsInstance(gpt, model_interface.GPTModelGenerator)
+        self.assertEqual(mock_openai.call_count, 2)
+
+
 class TestGPTModelGenerator(unittest.IsolatedAsyncioTestCase):
     @staticmethod
     async def _mock_to_thread_call(func, *args, **kwargs):
@@ -69,7 +83,8 @@ class TestGPTModelGenerator(unittest.IsolatedAsyncioTestCase):
         self.assertIsNotNone(image)
         self.assertEqual(text, "edit banana")
         self.assertIsNotNone(usage)
-        mock_to_thread.assert_awaited_once()
+        # One thread hop for the input PNG encode, one for the API request
+        self.assertEqual(mock_to_thread.await_count, 2)
 
         kwargs = mock_responses.create.call_args.kwargs
         self.assertEqual(kwargs["model"], "gpt-5.4")
@@ -133,6 +148,21 @@ class TestChatModelGeneratorToolCalling(unittest.IsolatedAsyncioTestCase):
         usage = SimpleNamespace(prompt_tokens=5, completion_tokens=2, total_tokens=7)
         return SimpleNamespace(choices=[choice], usage=usage)
 
+    async def test_tool_result_images_downloaded_once_each_in_order(self):
+        with patch.object(model_interface.config, "OPENAI_API_KEY", "test-key"), \
+             patch.object(model_interface, "OpenAI"), \
+             patch.object(model_interface, "download_image", AsyncMock(side_effect=["a", None])) as mock_download:
+            generator = model_interface.ChatModelGenerator()
+            images = await generator._download_tool_result_images(
+                ["https://x/a.png", "", "https://x/a.png", "https://x/b.png"]
+            )
+
+        self.assertEqual(images, ["a"])
+        self.assertEqual(
+            [c.args[0] for c in mock_download.await_args_list],
+            ["https://x/a.png", "https://x/b.png"],
+        )
+
     async def test_tool_call_uses_gemini_model(self):
         """When the model returns a generate_image tool call with model='gemini', GeminiModelGenerator is used."""
         tool_call = self._make_tool_call("a red apple", "gemini")
@@ -63,6 +63,57 @@ class TestUsageReservations(unittest.TestCase):
         self.assertEqual(self.tracker.get_daily_image_count(self.user_id), 1)
         self.assertEqual(self.tracker.get_remaining_images_today(self.user_id), 2)
 
+    def test_image_quota_status_reports_count_tier_and_limit(self):
+        self.assertEqual(self.tracker.get_image_quota_status(self.user_id), (0, "standard", 3))
+
+        self.tracker.set_user_tier(self.user_id, "extra", username="test-user")
+        self.tracker.record_usage(
+            user_id=self.user_id,
+            username="test-user",
+            prompt_tokens=0,
+            output_tokens=0,
+            total_tokens=0,
+            images_generated=1,
+        )
+
+        self.assertEqual(self.tracker.get_image_quota_status(self.user_id), (1, "extra", 5))
+
+    def test_record_usage_batch_saves_once_and_skips_bad_records(self):
+        records = [
+            {"user_id": self.user_id, "username": "test-user", "prompt_tokens": 1,
+             "output_tokens": 2, "total_tokens": 3, "images_generated": 1},
+            {"user_id": self.user_id, "username": "test-user"},  # missing token counts
+            {"user_id": self.user_id, "username": "test-user", "prompt_tokens": 4,
+             "output_tokens": 5, "total_tokens": 9, "images_generated": 1},
+        ]
+
+        with patch.object(self.tracker, "_save_usage_data", wraps=self.tracker._save_usage_data) as mock_save:
+            self.tracker.record_usage_batch(records)
+
+        self.assertEqual(mock_save.call_count, 1)
+        usage = self.tracker.get_user_usage(self.user_id)
+        self.assertEqual(usage["total_tokens"], 12)
+        self.assertEqual(usage["requests_count"], 2)
+        self.assertEqual(self.tracker.get_daily_image_count(self.user_id), 2)
+
+    def test_usage_limit_check_reads_usage_file_once(self):
+        for _ in range(3):
+            self.tracker.record_usage(
+                user_id=self.user_id,
+                username="test-user",
+                prompt_tokens=0,
+                output_tokens=0,
+                total_tokens=0,
+                images_generated=1,
+            )
+
+        with patch.object(self.tracker, "_load_usage_data", wraps=self.tracker._load_usage_data) as mock_load:
+            has_limit, next_available = self.tracker.has_reached_usage_limit(self.user_id)
+
+        self.assertTrue(has_limit)
+        self.assertIsNotNone(next_available)
+        self.assertEqual(mock_load.call_count, 1)
+
     def test_wordplay_style_two_slot_reservation(self):
         ok, _ = self.tracker.reserve_usage_slots(self.user_id, slots=2)
         self.assertTrue(ok)
@@ -2,6 +2,8 @@
 Unit tests for wordplay game module.
 """
 
+import os
+import tempfile
 import unittest
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime, timedelta
@@ -256,6 +258,77 @@ class TestWordplaySessionManager(unittest.TestCase):
         # This should not raise an exception
         self.manager.remove_session(99999)
 
+    
+    def test_remove_expired_sessions(self):
+        """Test that only sessions older than 24 hours are removed."""
+        old_session = self.manager.create_session(1, 12345, "plant", "planet", "e", "old")
+        self.manager.create_session(2, 12345, "star", "stair", "i", "fresh")
+        old_session.created_at = datetime.now() - timedelta(hours=25)
+        
+        removed = self.manager.remove_expired_sessions()
+        
+        self.assertEqual(removed, 1)
+        self.assertIsNone(self.manager.get_session(1))
+        self.assertIsNotNone(self.manager.get_session(2))
+    
+    def test_sessions_persist_across_managers(self):
+        """Test that sessions saved by one manager are reloaded by the next."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage_file = os.path.join(temp_dir, "sessions.json")
+            manager = WordplaySessionManager(storage_file)
+            session = manager.create_session(999888, 12345, "plant", "planet", "e", "test_puzzle_1")
+            session.check_answer(111, "x")
+            session.check_answer(222, "e")
+            session.point_awarded_users.add(222)
+            manager.save_sessions()
+            expired = manager.create_session(777, 12345, "star", "stair", "i", "old")
+            expired.created_at = datetime.now() - timedelta(hours=25)
+            manager.save_sessions()
+            
+            reloaded = WordplaySessionManager(storage_file)
+            reloaded.load_sessions()
+        
+        restored = reloaded.get_session(999888)
+        self.assertEqual(restored.longer_word, "PLANET")
+        self.assertEqual(restored.get_attempts_remaining(111), 2)
+        self.assertIn(222, restored.solved_by_users)
+        self.assertIn(222, restored.point_awarded_users)
+        self.assertIsNone(reloaded.get_session(777))
+    
+    def test_sessions_are_loaded_on_first_use_not_construction(self):
+        """Test that a manager doesn't read its file until it is first used."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage_file = os.path.join(temp_dir, "sessions.json")
+            manager = WordplaySessionManager(storage_file)
+            manager.create_session(999888, 12345, "plant", "planet", "e", "test_puzzle_1")
+            manager.save_sessions()
+            
+            reloaded = WordplaySessionManager(storage_file)
+            self.assertEqual(reloaded.sessions, {})
+            self.assertIsNotNone(reloaded.get_session(999888))
+
+class TestWordplaySessionSaving(unittest.IsolatedAsyncioTestCase):
+    """Test saving sessions from inside the event loop."""
+    
+    async def test_saves_in_loop_are_coalesced_into_background_writes(self):
+        """Test that saves made in the loop are written off it and coalesced."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage_file = os.path.join(temp_dir, "sessions.json")
+            manager = WordplaySessionManager(storage_file)
+            
+            with patch.object(manager, "_write_sessions", wraps=manager._write_sessions) as mock_write:
+                manager.create_session(1, 12345, "plant", "planet", "e", "first")
+                manager.create_session(2, 12345, "star", "stair", "i", "second")
+                self.assertFalse(os.path.exists(storage_file))
+                await manager.flush_sessions()
+            
+            self.assertEqual(mock_write.call_count, 1)
+            reloaded = WordplaySessionManager(storage_file)
+            reloaded.load_sessions()
+        
+        self.assertIsNotNone(reloaded.get_session(1))
+        self.assertIsNotNone(reloaded.get_session(2))
+
 
 class TestValidateWordPair(unittest.TestCase):
     """Test word pair validation."""
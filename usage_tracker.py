@@ -67,31 +67,37 @@ class UsageTracker:
         """
         with self._lock:
             data = self._load_usage_data()
-            user_id_str = str(user_id)
-            
-            # Get user's tier limit (using unlocked version since we're already in a lock)
-            user_tier = self._get_user_tier_unlocked(user_id, data)
-            tier_limit = TIER_LIMITS.get(user_tier, config.DAILY_IMAGE_LIMIT)
-            
-            if user_id_str not in data["users"]:
-                return tier_limit  # All slots available for new users
-            
-            user_data = data["users"][user_id_str]
-            usage_timestamps = user_data.get("usage_timestamps", [])
-            
-            # Filter out timestamps older than 8 hours
-            now = datetime.now()
-            cutoff_time = now - timedelta(hours=self.rate_limit_hours)
-            
-            active_usages = [
-                ts for ts in usage_timestamps
-                if datetime.fromisoformat(ts) > cutoff_time
-            ]
-            
-            pending_usages = max(0, int(user_data.get("pending_usages", 0)))
-            
-            # Return number of available slots (active usages + queued usages)
-            return max(0, tier_limit - len(active_usages) - pending_usages)
+            return self._get_available_usage_slots_unlocked(user_id, data)
+    
+    def _get_available_usage_slots_unlocked(self, user_id: int, data: Dict[str, Any]) -> int:
+        """
+        Internal version of _get_available_usage_slots without acquiring lock.
+        Must be called from within a locked context with data already loaded.
+        """
+        user_id_str = str(user_id)
+        
+        user_tier = self._get_user_tier_unlocked(user_id, data)
+        tier_limit = TIER_LIMITS.get(user_tier, config.DAILY_IMAGE_LIMIT)
+        
+        if user_id_str not in data["users"]:
+            return tier_limit  # All slots available for new users
+        
+        user_data = data["users"][user_id_str]
+        usage_timestamps = user_data.get("usage_timestamps", [])
+        
+        # Filter out timestamps older than 8 hours
+        now = datetime.now()
+        cutoff_time = now - timedelta(hours=self.rate_limit_hours)
+        
+        active_usages = [
+            ts for ts in usage_timestamps
+            if datetime.fromisoformat(ts) > cutoff_time
+        ]
+        
+        pending_usages = max(0, int(user_data.get("pending_usages", 0)))
+        
+        # Return number of available slots (active usages + queued usages)
+        return max(0, tier_limit - len(active_usages) - pending_usages)
     
     def _get_next_available_time(self, user_id: int) -> Optional[datetime]:
         """
@@ -102,38 +108,44 @@ class UsageTracker:
         """
         with self._lock:
             data = self._load_usage_data()
-            user_id_str = str(user_id)
-            
-            if user_id_str not in data["users"]:
-                return None  # All slots available
-            
-            user_data = data["users"][user_id_str]
-            usage_timestamps = user_data.get("usage_timestamps", [])
-            
-            if not usage_timestamps:
-                return None  # All slots available
-            
-            # Filter out timestamps older than 8 hours
-            now = datetime.now()
-            cutoff_time = now - timedelta(hours=self.rate_limit_hours)
-            
-            active_usages = [
-                datetime.fromisoformat(ts) for ts in usage_timestamps
-                if datetime.fromisoformat(ts) > cutoff_time
-            ]
-            
-            # Get user's tier limit (using unlocked version since we're already in a lock)
-            user_tier = self._get_user_tier_unlocked(user_id, data)
-            tier_limit = TIER_LIMITS.get(user_tier, config.DAILY_IMAGE_LIMIT)
-            
-            if len(active_usages) < tier_limit:
-                return None  # At least one slot is available
-            
-            # Find the oldest active usage and calculate when it expires
-            oldest_usage = min(active_usages)
-            next_available = oldest_usage + timedelta(hours=self.rate_limit_hours)
-            
-            return next_available
+            return self._get_next_available_time_unlocked(user_id, data)
+    
+    def _get_next_available_time_unlocked(self, user_id: int, data: Dict[str, Any]) -> Optional[datetime]:
+        """
+        Internal version of _get_next_available_time without acquiring lock.
+        Must be called from within a locked context with data already loaded.
+        """
+        user_id_str = str(user_id)
+        
+        if user_id_str not in data["users"]:
+            return None  # All slots available
+        
+        user_data = data["users"][user_id_str]
+        usage_timestamps = user_data.get("usage_timestamps", [])
+        
+        if not usage_timestamps:
+            return None  # All slots available
+        
+        # Filter out timestamps older than 8 hours
+        now = datetime.now()
+        cutoff_time = now - timedelta(hours=self.rate_limit_hours)
+        
+        active_usages = [
+            datetime.fromisoformat(ts) for ts in usage_timestamps
+            if datetime.fromisoformat(ts) > cutoff_time
+        ]
+        
+        user_tier = self._get_user_tier_unlocked(user_id, data)
+        tier_limit = TIER_LIMITS.get(user_tier, config.DAILY_IMAGE_LIMIT)
+        
+        if len(active_usages) < tier_limit:
+            return None  # At least one slot is available
+        
+        # Find the oldest active usage and calculate when it expires
+        oldest_usage = min(active_usages)
+        next_available = oldest_usage + timedelta(hours=self.rate_limit_hours)
+        
+        return next_available
     
     def _load_usage_data(self) -> Dict[str, Any]:
         """Load usage data from JSON file."""
@@ -209,81 +221,126 @@ class UsageTracker:
             channel_id: Discord channel ID where the command was used (optional)
             channel_name: Discord channel name where the command was used (optional)
         """
+        self.record_usage_batch([{
+            "user_id": user_id,
+            "username": username,
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": total_tokens,
+            "images_generated": images_generated,
+            "consume_reserved_slots": consume_reserved_slots,
+            "channel_id": channel_id,
+            "channel_name": channel_name,
+        }])
+    
+    def record_usage_batch(self, records: List[Dict[str, Any]]):
+        """
+        Record several usages with a single load and save of the usage file.
+        
+        Args:
+            records: Dicts of record_usage keyword arguments, applied in order. A record
+                     that fails to apply is logged and skipped without dropping the rest.
+        """
         with self._lock:
             data = self._load_usage_data()
             
-            user_id_str = str(user_id)
-            if user_id_str not in data["users"]:
-                data["users"][user_id_str] = {
-                    "username": username,
-                    "total_prompt_tokens": 0,
-                    "total_output_tokens": 0,
-                    "total_tokens": 0,
-                    "images_generated": 0,
-                    "requests_count": 0,
-                    "first_use": datetime.now().isoformat(),
-                    "last_use": datetime.now().isoformat(),
-                    "usage_timestamps": [],  # List of timestamps for each image generation
-                    "wordplay_score": 0  # Score for wordplay puzzles
-                }
-            
-            user_data = data["users"][user_id_str]
-            user_data["username"] = username  # Update username in case it changed
-            user_data["total_prompt_tokens"] += prompt_tokens
-            user_data["total_output_tokens"] += output_tokens
-            user_data["total_tokens"] += total_tokens
-            user_data["images_generated"] += images_generated
-            user_data["requests_count"] += 1
-            user_data["last_use"] = datetime.now().isoformat()
-            
-            if consume_reserved_slots > 0:
-                current_pending = max(0, int(user_data.get("pending_usages", 0)))
-                if consume_reserved_slots > current_pending:
-                    logger.warning(
-                        f"Attempted to consume {consume_reserved_slots} reserved slots for user {user_id}, "
-                        f"but only {current_pending} slot(s) were pending"
-                    )
-                consumed_slots = min(consume_reserved_slots, current_pending)
-                user_data["pending_usages"] = current_pending - consumed_slots
-            
-            # Track image generation timestamp if any were generated
-            if images_generated > 0:
-                if "usage_timestamps" not in user_data:
-                    user_data["usage_timestamps"] = []
-                
-                # Add timestamp for this usage
-                user_data["usage_timestamps"].append(datetime.now().isoformat())
-                
-                # Clean up old timestamps (older than 8 hours)
-                cutoff_time = datetime.now() - timedelta(hours=self.rate_limit_hours)
-                user_data["usage_timestamps"] = [
-                    ts for ts in user_data["usage_timestamps"]
-                    if datetime.fromisoformat(ts) > cutoff_time
-                ]
+            usage_log_entries = []
+            for record in records:
+                try:
+                    log_entry = self._apply_usage_record_unlocked(data, **record)
+                except Exception as e:
+                    logger.error(f"Failed to record usage for user {record.get('user_id')}: {e}")
+                    continue
+                if log_entry:
+                    usage_log_entries.append(log_entry)
             
             self._save_usage_data(data)
             
-            logger.info(f"Recorded usage for user {username} ({user_id}): "
-                       f"prompt={prompt_tokens}, output={output_tokens}, "
-                       f"total={total_tokens}, images={images_generated}")
-
             # Write a persistent log entry for each usage charge consumed
-            if images_generated > 0:
-                user_tier = self._get_user_tier_unlocked(user_id, data)
-                if user_id in config.ELEVATED_USERS or user_tier == 'unlimited':
-                    tier_limit = float('inf')
-                    active_count = 0
-                else:
-                    tier_limit = TIER_LIMITS.get(user_tier, config.DAILY_IMAGE_LIMIT)
-                    now_cutoff = datetime.now() - timedelta(hours=self.rate_limit_hours)
-                    active_count = sum(
-                        1 for ts in user_data.get("usage_timestamps", [])
-                        if datetime.fromisoformat(ts) > now_cutoff
-                    )
-                self._append_usage_log(
-                    user_id, username, active_count, tier_limit,
-                    channel_id, channel_name
+            for log_entry in usage_log_entries:
+                self._append_usage_log(*log_entry)
+    
+    def _apply_usage_record_unlocked(self, data: Dict[str, Any], user_id: int, username: str,
+                                     prompt_tokens: int, output_tokens: int, total_tokens: int,
+                                     images_generated: int = 0, consume_reserved_slots: int = 0,
+                                     channel_id: Optional[int] = None,
+                                     channel_name: Optional[str] = None) -> Optional[Tuple]:
+        """
+        Apply one usage record to already loaded data without acquiring lock or saving.
+        Must be called from within a locked context.
+        
+        Returns:
+            _append_usage_log arguments if an image was generated, otherwise None
+        """
+        user_id_str = str(user_id)
+        if user_id_str not in data["users"]:
+            data["users"][user_id_str] = {
+                "username": username,
+                "total_prompt_tokens": 0,
+                "total_output_tokens": 0,
+                "total_tokens": 0,
+                "images_generated": 0,
+                "requests_count": 0,
+                "first_use": datetime.now().isoformat(),
+                "last_use": datetime.now().isoformat(),
+                "usage_timestamps": [],  # List of timestamps for each image generation
+                "wordplay_score": 0  # Score for wordplay puzzles
+            }
+        
+        user_data = data["users"][user_id_str]
+        user_data["username"] = username  # Update username in case it changed
+        user_data["total_prompt_tokens"] += prompt_tokens
+        user_data["total_output_tokens"] += output_tokens
+        user_data["total_tokens"] += total_tokens
+        user_data["images_generated"] += images_generated
+        user_data["requests_count"] += 1
+        user_data["last_use"] = datetime.now().isoformat()
+        
+        if consume_reserved_slots > 0:
+            current_pending = max(0, int(user_data.get("pending_usages", 0)))
+            if consume_reserved_slots > current_pending:
+                logger.warning(
+                    f"Attempted to consume {consume_reserved_slots} reserved slots for user {user_id}, "
+                    f"but only {current_pending} slot(s) were pending"
                 )
+            consumed_slots = min(consume_reserved_slots, current_pending)
+            user_data["pending_usages"] = current_pending - consumed_slots
+        
+        # Track image generation timestamp if any were generated
+        if images_generated > 0:
+            if "usage_timestamps" not in user_data:
+                user_data["usage_timestamps"] = []
+            
+            # Add timestamp for this usage
+            user_data["usage_timestamps"].append(datetime.now().isoformat())
+            
+            # Clean up old timestamps (older than 8 hours)
+            cutoff_time = datetime.now() - timedelta(hours=self.rate_limit_hours)
+            user_data["usage_timestamps"] = [
+                ts for ts in user_data["usage_timestamps"]
+                if datetime.fromisoformat(ts) > cutoff_time
+            ]
+        
+        logger.info(f"Recorded usage for user {username} ({user_id}): "
+                   f"prompt={prompt_tokens}, output={output_tokens}, "
+                   f"total={total_tokens}, images={images_generated}")
+        
+        if images_generated <= 0:
+            return None
+        
+        # Remaining charges as of this record, for the usage log written after saving
+        user_tier = self._get_user_tier_unlocked(user_id, data)
+        if user_id in config.ELEVATED_USERS or user_tier == 'unlimited':
+            tier_limit = float('inf')
+            active_count = 0
+        else:
+            tier_limit = TIER_LIMITS.get(user_tier, config.DAILY_IMAGE_LIMIT)
+            now_cutoff = datetime.now() - timedelta(hours=self.rate_limit_hours)
+            active_count = sum(
+                1 for ts in user_data.get("usage_timestamps", [])
+                if datetime.fromisoformat(ts) > now_cutoff
+            )
+        return user_id, username, active_count, tier_limit, channel_id, channel_name
 
     def reserve_usage_slots(self, user_id: int, slots: int = 1, username: Optional[str] = None) -> Tuple[bool, Optional[datetime]]:
         """
@@ -299,15 +356,15 @@ class UsageTracker:
         if user_id in config.ELEVATED_USERS:
             return True, None
         
-        # Unlimited tier users never need reservations
-        user_tier = self.get_user_tier(user_id)
-        if user_tier == 'unlimited':
-            return True, None
-        
         with self._lock:
             data = self._load_usage_data()
             user_id_str = str(user_id)
             
+            # Unlimited tier users never need reservations
+            user_tier = self._get_user_tier_unlocked(user_id, data)
+            if user_tier == 'unlimited':
+                return True, None
+            
             # Create user entry if needed
             if user_id_str not in data["users"]:
                 data["users"][user_id_str] = {
@@ -359,14 +416,13 @@ class UsageTracker:
         if user_id in config.ELEVATED_USERS:
             return
         
-        user_tier = self.get_user_tier(user_id)
-        if user_tier == 'unlimited':
-            return
-        
         with self._lock:
             data = self._load_usage_data()
             user_id_str = str(user_id)
             
+            if self._get_user_tier_unlocked(user_id, data) == 'unlimited':
+                return
+            
             if user_id_str not in data["users"]:
                 return
             
@@ -448,6 +504,29 @@ class UsageTracker:
             
             return active_count
     
+    def get_image_quota_status(self, user_id: int) -> Tuple[int, str, Union[int, float]]:
+        """
+        Get a user's active usage count, tier and tier limit from a single read of the usage file.
+        
+        Returns:
+            Tuple of (active_count, tier, tier_limit)
+        """
+        with self._lock:
+            data = self._load_usage_data()
+            user_tier = self._get_user_tier_unlocked(user_id, data)
+            tier_limit = TIER_LIMITS.get(user_tier, config.DAILY_IMAGE_LIMIT)
+            
+            user_data = data["users"].get(str(user_id))
+            if not user_data:
+                return 0, user_tier, tier_limit
+            
+            cutoff_time = datetime.now() - timedelta(hours=self.rate_limit_hours)
+            active_count = sum(
+                1 for ts in user_data.get("usage_timestamps", [])
+                if datetime.fromisoformat(ts) > cutoff_time
+            )
+            return active_count, user_tier, tier_limit
+    
     def has_reached_usage_limit(self, user_id: int) -> Tuple[bool, Optional[datetime]]:
         """
         Check if a user has reached their usage limit (all slots are full).
@@ -459,18 +538,17 @@ class UsageTracker:
         if user_id in config.ELEVATED_USERS:
             return False, None
         
-        # Unlimited tier users never reach usage limit
-        user_tier = self.get_user_tier(user_id)
-        if user_tier == 'unlimited':
-            return False, None
-        
-        available_slots = self._get_available_usage_slots(user_id)
-        
-        if available_slots > 0:
-            return False, None
-        else:
-            next_available = self._get_next_available_time(user_id)
-            return True, next_available
+        # Tier, free slots and next expiry all come from one read of the usage file
+        with self._lock:
+            data = self._load_usage_data()
+            
+            # Unlimited tier users never reach usage limit
+            if self._get_user_tier_unlocked(user_id, data) == 'unlimited':
+                return False, None
+            
+            if self._get_available_usage_slots_unlocked(user_id, data) > 0:
+                return False, None
+            return True, self._get_next_available_time_unlocked(user_id, data)
     
     def can_generate_image(self, user_id: int) -> bool:
         """Check if a user can generate an image (has at least one available slot)."""
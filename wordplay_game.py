@@ -3,23 +3,33 @@ Wordplay puzzle game module for Discord bot.
 Generates word pairs following the Extra-Letter rule and manages game sessions.
 """
 
+import json
 import logging
 import asyncio
+import os
 import random
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple, Any
 from PIL import Image
+import config
 
 logger = logging.getLogger(__name__)
 
 # Session configuration
-# Sessions persist until solved or failed (no time-based expiration)
+# Sessions stay open to every player until they are older than SESSION_MAX_AGE, then the cleanup task drops them
 SESSION_CLEANUP_INTERVAL = 300  # Cleanup runs every 5 minutes (in seconds)
+SESSION_MAX_AGE = timedelta(hours=24)  # Sessions older than this are dropped by the cleanup task
 
 
 class WordplaySession:
     """Represents a single wordplay game session for a message."""
     
+    # Sessions live for up to a day, one per puzzle message, so skip the per-instance __dict__
+    __slots__ = (
+        'message_id', 'creator_user_id', 'shorter_word', 'longer_word', 'extra_letters',
+        'puzzle_id', 'created_at', 'user_attempts', 'solved_by_users', 'point_awarded_users',
+    )
+    
     def __init__(self, message_id: int, creator_user_id: int, shorter_word: str, longer_word: str, extra_letters: str, puzzle_id: str):
         self.message_id = message_id
         self.creator_user_id = creator_user_id  # User who created the puzzle
@@ -69,36 +79,179 @@ class WordplaySession:
     def get_attempts_remaining(self, user_id: int) -> int:
         """Get the number of attempts remaining for a specific user."""
         return self.user_attempts.get(user_id, 3)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the session to a JSON-compatible dict."""
+        return {
+            "message_id": self.message_id,
+            "creator_user_id": self.creator_user_id,
+            "shorter_word": self.shorter_word,
+            "longer_word": self.longer_word,
+            "extra_letters": self.extra_letters,
+            "puzzle_id": self.puzzle_id,
+            "created_at": self.created_at.isoformat(),
+            "user_attempts": {str(user_id): attempts for user_id, attempts in self.user_attempts.items()},
+            "solved_by_users": list(self.solved_by_users),
+            "point_awarded_users": list(self.point_awarded_users),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'WordplaySession':
+        """Rebuild a session from to_dict() output."""
+        session = cls(
+            data["message_id"],
+            data["creator_user_id"],
+            data["shorter_word"],
+            data["longer_word"],
+            data["extra_letters"],
+            data["puzzle_id"],
+        )
+        session.created_at = datetime.fromisoformat(data["created_at"])
+        session.user_attempts = {int(user_id): attempts for user_id, attempts in data.get("user_attempts", {}).items()}
+        session.solved_by_users = set(data.get("solved_by_users", []))
+        session.point_awarded_users = set(data.get("point_awarded_users", []))
+        return session
 
 
 class WordplaySessionManager:
-    """Manages active wordplay sessions for messages."""
+    """
+    Manages active wordplay sessions for messages.
+    
+    When storage_file is given, sessions are saved to it as JSON and reloaded by
+    load_sessions() (or on first use), so puzzles posted before a restart can still be answered.
+    Nothing is read at construction, so importing this module doesn't touch the disk.
+    """
     
-    def __init__(self):
+    def __init__(self, storage_file: Optional[str] = None):
         self.sessions: Dict[int, WordplaySession] = {}  # message_id -> session
         self._cleanup_task = None
+        self._save_task = None
+        self._save_pending = False
+        self._loaded = False
+        self.storage_file = storage_file
+    
+    def load_sessions(self):
+        """Load saved sessions that haven't expired from storage_file, once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.storage_file or not os.path.exists(self.storage_file):
+            return
+        try:
+            with open(self.storage_file, 'r') as f:
+                saved_sessions = json.load(f)
+            cutoff = datetime.now() - SESSION_MAX_AGE
+            sessions = [WordplaySession.from_dict(data) for data in saved_sessions]
+            # Keep creation order so expiry sweeps can stop at the first fresh session
+            for session in sorted(sessions, key=lambda s: s.created_at):
+                if session.created_at >= cutoff:
+                    self.sessions[session.message_id] = session
+            logger.info(f"Loaded {len(self.sessions)} saved wordplay sessions")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error loading wordplay sessions: {e}")
+    
+    def save_sessions(self):
+        """
+        Save all sessions to storage_file, if one is configured.
+        
+        Inside the event loop the write happens in a background task, so the loop never waits
+        on disk; saves requested while a write is in flight are coalesced into one more write.
+        Without a running loop the file is written directly.
+        """
+        if not self.storage_file:
+            return
+        # Never overwrite the file before its saved sessions have been read
+        self.load_sessions()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_sessions(self._snapshot_sessions())
+            return
+        self._save_pending = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_in_background())
+    
+    async def flush_sessions(self):
+        """Wait for any background save to finish, e.g. before shutting down."""
+        if self._save_task is not None:
+            await self._save_task
+    
+    async def _save_in_background(self):
+        """Write the latest sessions until no further save has been requested."""
+        while self._save_pending:
+            self._save_pending = False
+            # Snapshot on the loop so handlers can't change sessions while the thread writes
+            snapshot = self._snapshot_sessions()
+            await asyncio.to_thread(self._write_sessions, snapshot)
+    
+    def _snapshot_sessions(self) -> list:
+        """Return all sessions as JSON-compatible dicts."""
+        return [session.to_dict() for session in self.sessions.values()]
+    
+    def _write_sessions(self, snapshot: list):
+        """Write a sessions snapshot to storage_file (blocking), replacing it atomically."""
+        try:
+            temp_file = f"{self.storage_file}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(temp_file, self.storage_file)
+        except OSError as e:
+            logger.error(f"Error saving wordplay sessions: {e}")
     
     def create_session(self, message_id: int, creator_user_id: int, shorter_word: str, longer_word: str, extra_letters: str, puzzle_id: str) -> WordplaySession:
         """Create a new session for a message."""
+        self.load_sessions()
         # Clean up any existing session for this message
         if message_id in self.sessions:
             del self.sessions[message_id]
         
         session = WordplaySession(message_id, creator_user_id, shorter_word, longer_word, extra_letters, puzzle_id)
         self.sessions[message_id] = session
+        self.save_sessions()
         logger.info(f"Created wordplay session for message {message_id} by user {creator_user_id}: {shorter_word} -> {longer_word} (puzzle_id: {puzzle_id})")
         return session
     
     def get_session(self, message_id: int) -> Optional[WordplaySession]:
         """Get the active session for a message."""
+        self.load_sessions()
         return self.sessions.get(message_id)
     
     def remove_session(self, message_id: int):
         """Remove a session for a message."""
+        self.load_sessions()
         if message_id in self.sessions:
             del self.sessions[message_id]
+            self.save_sessions()
             logger.info(f"Removed wordplay session for message {message_id}")
     
+    def remove_expired_sessions(self) -> int:
+        """
+        Remove sessions older than SESSION_MAX_AGE and return how many were removed.
+        
+        Sessions are stored in creation order, so the scan stops at the first one
+        that is still fresh.
+        """
+        self.load_sessions()
+        cutoff = datetime.now() - SESSION_MAX_AGE
+        old_sessions = []
+        for message_id, session in self.sessions.items():
+            if session.created_at >= cutoff:
+                break
+            old_sessions.append(message_id)
+        
+        for message_id in old_sessions:
+            del self.sessions[message_id]
+        
+        if old_sessions:
+            self.save_sessions()
+            logger.info(f"Cleaned up {len(old_sessions)} old wordplay sessions (>24h)")
+        return len(old_sessions)
+    
+    def start_cleanup_task(self):
+        """Start the periodic cleanup task if it isn't already running."""
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(self.cleanup_expired_sessions())
+    
     async def cleanup_expired_sessions(self):
         """
         Periodically clean up old sessions.
@@ -109,24 +262,13 @@ class WordplaySessionManager:
         while True:
             try:
                 await asyncio.sleep(SESSION_CLEANUP_INTERVAL)
-                
-                # Clean up sessions older than 24 hours
-                old_sessions = [
-                    message_id for message_id, session in self.sessions.items()
-                    if (datetime.now() - session.created_at).total_seconds() > 86400  # 24 hours
-                ]
-                
-                for message_id in old_sessions:
-                    del self.sessions[message_id]
-                
-                if old_sessions:
-                    logger.info(f"Cleaned up {len(old_sessions)} old wordplay sessions (>24h)")
+                self.remove_expired_sessions()
             except Exception as e:
                 logger.error(f"Error cleaning up wordplay sessions: {e}")
 
 
-# Global session manager
-session_manager = WordplaySessionManager()
+# Global session manager, persisted next to the usage stats
+session_manager = WordplaySessionManager(config.WORDPLAY_SESSIONS_FILE)
 
 
 async def generate_word_pair_with_gemini(generator, min_word_length: int = 4, letter_difference: int = 1) -> Optional[Tuple[str, str, str]]: